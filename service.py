@@ -0,0 +1,12 @@
+# cost_car_calc/service.py
+import sys
+import os
+
+# Fügt das Projekt-Stammverzeichnis zum Python-Pfad hinzu (wie in main.py).
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from src.service import main
+
+if __name__ == "__main__":
+    main()
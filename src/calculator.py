@@ -3,6 +3,68 @@ from .car import Car
 from .financing import Financing
 from .insurance import Insurance
 import math
+import numpy as np
+
+# Standardwerte der gespeicherten Parameter (identisch zu den Vorgaben beim Laden in der GUI)
+PARAMETER_DEFAULTS = {
+    "car_purchase_price": 0.0,
+    "car_running_costs_monthly": 0.0,
+    "car_consumption_per_100km": 0.0,
+    "financing_interest_rate_percent": 0.0,
+    "financing_duration_years": 0,
+    "financing_balloon_payment": 0.0,
+    "insurance_annual_cost": 0.0,
+    "usage_km_per_year": 15000.0,
+    "usage_fuel_price_per_liter": 1.70,
+    "usage_car_lifetime_years": 10,
+    "general_operating_cost_increase_percent": 2.0,
+}
+
+COST_COMPONENTS = ("financing", "operation", "insurance", "fuel")
+
+
+def loan_payment(principal: float, annual_interest_rate_percent: float, number_of_payments: int,
+                 balloon_payment: float = 0.0) -> float:
+    """
+    Monatliche Annuitätenrate eines Kredits mit optionaler Schlussrate am Ende der Laufzeit.
+
+    Args:
+        principal (float): Finanzierter Betrag.
+        annual_interest_rate_percent (float): Jährlicher Zinssatz in Prozent.
+        number_of_payments (int): Laufzeit in Monaten.
+        balloon_payment (float): Schlussrate, die zusätzlich zur letzten Rate fällig wird.
+    """
+    if number_of_payments <= 0 or principal < 0:
+        return 0.0
+
+    monthly_interest_rate = (annual_interest_rate_percent / 100.0) / 12.0
+
+    pv_balloon_payment = 0.0
+    if balloon_payment > 0:
+        if monthly_interest_rate > 0:
+            try:
+                pv_balloon_payment = balloon_payment / math.pow(1 + monthly_interest_rate, number_of_payments)
+            except OverflowError:
+                pv_balloon_payment = 0
+        else:
+            pv_balloon_payment = balloon_payment
+
+    effective_principal = principal - pv_balloon_payment
+
+    if effective_principal <= 0:
+        return 0.0
+
+    if monthly_interest_rate == 0:
+        return effective_principal / number_of_payments
+
+    try:
+        payment = effective_principal * (monthly_interest_rate * math.pow(1 + monthly_interest_rate, number_of_payments)) / \
+                  (math.pow(1 + monthly_interest_rate, number_of_payments) - 1)
+    except (OverflowError, ZeroDivisionError):
+        payment = float('inf')
+
+    return payment if payment > 1e-6 else 0.0
+
 
 class CostCalculator:
     def __init__(self,
@@ -20,49 +82,39 @@ class CostCalculator:
         self.operating_cost_increase_percent = operating_cost_increase_percent
         self.km_per_month = self.km_per_year / 12.0 if self.km_per_year else 0.0
 
-    def _calculate_monthly_loan_payment(self) -> float:
-        principal = self.car.purchase_price
-        annual_interest_rate_percent = self.financing.interest_rate_percent
-        loan_term_years = self.financing.duration_years
-        balloon_payment = self.financing.balloon_payment
+    @classmethod
+    def from_parameters(cls, params: dict) -> "CostCalculator":
+        """
+        Erzeugt einen Rechner aus einem Parameter-Dict im Format der data.json.
 
-        if loan_term_years <= 0 or principal < 0:
-            return 0.0
-        
-        monthly_interest_rate = (annual_interest_rate_percent / 100.0) / 12.0
-        number_of_payments = loan_term_years * 12
-
-        if number_of_payments == 0:
-            return 0.0 if principal <= balloon_payment else float('inf')
-
-        pv_balloon_payment = 0.0
-        if balloon_payment > 0:
-            if monthly_interest_rate > 0:
-                try:
-                    pv_balloon_payment = balloon_payment / math.pow(1 + monthly_interest_rate, number_of_payments)
-                except OverflowError: 
-                    pv_balloon_payment = 0 
-            else: 
-                pv_balloon_payment = balloon_payment
-        
-        effective_principal = principal - pv_balloon_payment
-
-        if effective_principal <= 0: 
-            return 0.0
+        Args:
+            params (dict): Gespeicherte Parameter (fehlende Schlüssel erhalten PARAMETER_DEFAULTS).
+        """
+        p = {**PARAMETER_DEFAULTS, **params}
+        return cls(
+            car=Car(purchase_price=float(p["car_purchase_price"]),
+                    running_costs_monthly=float(p["car_running_costs_monthly"]),
+                    consumption_per_100km=float(p["car_consumption_per_100km"])),
+            financing=Financing(interest_rate_percent=float(p["financing_interest_rate_percent"]),
+                                duration_years=int(p["financing_duration_years"]),
+                                balloon_payment=float(p["financing_balloon_payment"])),
+            insurance=Insurance(annual_cost=float(p["insurance_annual_cost"])),
+            km_per_year=float(p["usage_km_per_year"]),
+            fuel_price_per_liter=float(p["usage_fuel_price_per_liter"]),
+            operating_cost_increase_percent=float(p["general_operating_cost_increase_percent"])
+        )
 
-        if monthly_interest_rate == 0:
-            return effective_principal / number_of_payments if number_of_payments > 0 else 0.0
+    def _calculate_monthly_loan_payment(self) -> float:
+        return loan_payment(self.car.purchase_price, self.financing.interest_rate_percent,
+                            self.financing.duration_years * 12, self.financing.balloon_payment)
 
-        try:
-            payment = effective_principal * (monthly_interest_rate * math.pow(1 + monthly_interest_rate, number_of_payments)) / \
-                      (math.pow(1 + monthly_interest_rate, number_of_payments) - 1)
-        except (OverflowError, ZeroDivisionError):
-            payment = float('inf') 
-        
-        return payment if payment > 1e-6 else 0.0
 
+    def get_cost_breakdown_for_chart(self, total_months_car_lifetime: int, exact_cents: bool = False) -> dict:
+        if exact_cents:
+            # Ganzzahliger Cent-Modus: siehe _breakdown_from_cents
+            components = self.get_monthly_components(1, total_months_car_lifetime)
+            return _breakdown_from_cents(_components_to_cents(components))
 
-    def get_cost_breakdown_for_chart(self, total_months_car_lifetime: int) -> dict:
         monthly_data_list = []
         _monthly_loan_payment_val = self._calculate_monthly_loan_payment()
         financing_duration_months = self.financing.duration_years * 12
@@ -130,4 +182,260 @@ class CostCalculator:
             "monthly_data": monthly_data_list,
             "total_lifetime_cost": round(grand_total_lifetime_cost, 2),
             "component_totals": component_totals # NEU
-        }
\ No newline at end of file
+        }
+
+    def get_monthly_components(self, first_month: int, last_month: int) -> dict:
+        """
+        Berechnet die ungerundeten Monatskosten der Monate first_month..last_month vektorisiert.
+
+        Returns:
+            dict: NumPy-Arrays je Kostenkomponente (Balkenwerte) sowie "financing_actual"
+                  (Finanzierung inkl. Schlussrate, wie sie in die Gesamtsummen eingeht).
+        """
+        rows = _monthly_component_matrix([self], first_month, last_month)
+        return {key: values[0] for key, values in rows.items()}
+
+
+def _monthly_component_matrix(calculators: list, first_month: int, last_month: int) -> dict:
+    """
+    Berechnet die Monatskosten mehrerer Rechner auf einmal als Matrix (Rechner x Monate).
+
+    Entspricht Monat für Monat der Schleife in get_cost_breakdown_for_chart, nur ohne Rundung;
+    die Rechenreihenfolge ist dieselbe, damit die Werte bitgenau übereinstimmen.
+    """
+    month_nums = np.arange(first_month, last_month + 1)
+    year_index = (month_nums - 1) // 12
+
+    def column(values, dtype=float):
+        return np.array(values, dtype=dtype).reshape(-1, 1)
+
+    growth = column([1 + (c.operating_cost_increase_percent / 100.0) for c in calculators])
+    inflation = np.power(growth, year_index)
+
+    loan_payment = column([c._calculate_monthly_loan_payment() for c in calculators])
+    financing_months = column([c.financing.duration_years * 12 for c in calculators], dtype=np.int64)
+    balloon = column([c.financing.balloon_payment for c in calculators])
+
+    in_financing = month_nums <= financing_months
+    financing_bar = np.where(in_financing, loan_payment, 0.0)
+    balloon_due = (month_nums == financing_months) & (balloon > 0)
+    financing_actual = financing_bar + np.where(balloon_due, balloon, 0.0)
+
+    operation = column([c.car.running_costs_monthly for c in calculators]) * inflation
+    insurance = column([c.insurance.get_monthly_cost() for c in calculators]) * inflation
+
+    # Wie in der Schleife: Verbrauch je Monat * (Kraftstoffpreis * Inflationsfaktor)
+    fuel_per_month = column([
+        (c.km_per_month / 100.0) * c.car.consumption_per_100km
+        if c.car.consumption_per_100km > 0 and c.km_per_month > 0 else 0.0
+        for c in calculators
+    ])
+    fuel = fuel_per_month * (column([c.fuel_price_per_liter for c in calculators]) * inflation)
+
+    return {
+        "financing": financing_bar,
+        "financing_actual": financing_actual,
+        "operation": operation,
+        "insurance": insurance,
+        "fuel": fuel,
+    }
+
+
+def monthly_rows_from_components(components: dict, first_month: int = 1) -> list:
+    """
+    Baut die gerundete "monthly_data"-Liste aus ungerundeten Komponenten-Arrays
+    (Format von CostCalculator.get_monthly_components).
+    """
+    bar_total = components["financing"] + components["operation"] + components["insurance"] + components["fuel"]
+    # Eingebautes round() statt np.round: np.round rundet über x * 100 und weicht dadurch
+    # bei manchen Beträgen um einen Cent von der Schleife in get_cost_breakdown_for_chart ab.
+    columns = [[round(value, 2) for value in components[key].tolist()] for key in COST_COMPONENTS]
+    rounded_totals = [round(value, 2) for value in bar_total.tolist()]
+    return _monthly_rows(columns, rounded_totals, first_month)
+
+
+def monthly_rows_from_cents(cents: dict, first_month: int = 1) -> list:
+    """
+    Baut die "monthly_data"-Liste aus int64-Centbeträgen (siehe to_cents);
+    die Monatssumme ist die exakte Summe der Posten.
+    """
+    bar_total = cents["financing"] + cents["operation"] + cents["insurance"] + cents["fuel"]
+    columns = [(cents[key] / 100).tolist() for key in COST_COMPONENTS]
+    return _monthly_rows(columns, (bar_total / 100).tolist(), first_month)
+
+
+def _monthly_rows(columns: list, totals: list, first_month: int) -> list:
+    return [
+        {
+            "month": first_month + i,
+            "financing": columns[0][i],
+            "operation": columns[1][i],
+            "insurance": columns[2][i],
+            "fuel": columns[3][i],
+            "total": totals[i]
+        }
+        for i in range(len(totals))
+    ]
+
+
+def _breakdown_from_components(components: dict, first_month: int = 1) -> dict:
+    """Formt ungerundete Komponenten-Arrays in das Ergebnisformat von get_cost_breakdown_for_chart um."""
+    monthly_data_list = monthly_rows_from_components(components, first_month)
+
+    component_totals = {
+        "financing": round(_running_sum(components["financing_actual"]), 2),
+        "operation": round(_running_sum(components["operation"]), 2),
+        "insurance": round(_running_sum(components["insurance"]), 2),
+        "fuel": round(_running_sum(components["fuel"]), 2)
+    }
+    monthly_totals = (components["financing_actual"] + components["operation"]
+                      + components["insurance"] + components["fuel"])
+
+    return {
+        "monthly_data": monthly_data_list,
+        "total_lifetime_cost": round(_running_sum(monthly_totals), 2),
+        "component_totals": component_totals
+    }
+
+
+def _running_sum(values) -> float:
+    """Summiert Monat für Monat wie die Schleife (np.sum summiert paarweise und rundet dadurch anders)."""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def to_cents(values) -> np.ndarray:
+    """
+    Rundet Eurobeträge kaufmännisch (ab ,5 vom Nullpunkt weg) auf ganze Cent als int64.
+
+    Dies ist die einzige Rundungsstelle im Cent-Modus: Jeder Monatsbetrag wird genau
+    einmal gerundet, alle Summen darüber sind exakte Ganzzahlsummen.
+
+    Raises:
+        ValueError: Bei nicht endlichen Beträgen (z.B. unendlicher Kreditrate) oder außerhalb von int64.
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        scaled = np.asarray(values, dtype=float) * 100.0
+        representable = np.abs(scaled) < 2.0 ** 63
+    if not np.all(representable):
+        raise ValueError("Nicht endliche oder zu große Beträge lassen sich nicht in Cent darstellen.")
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+
+def cents_to_euros(cents) -> float:
+    """Wandelt einen ganzzahligen Centbetrag für die Ausgabe in Euro um."""
+    return int(cents) / 100
+
+
+def _components_to_cents(components: dict) -> dict:
+    return {key: to_cents(values) for key, values in components.items()}
+
+
+def _breakdown_from_cents(cents: dict, first_month: int = 1) -> dict:
+    """
+    Wie _breakdown_from_components, aber aus int64-Centbeträgen.
+
+    Monatssumme und alle Gesamtsummen sind exakte Summen der gerundeten Monatsbeträge.
+    Zusätzlich enthält das Ergebnis die Summen als ganze Cent für den Abgleich mit der Buchhaltung.
+    """
+    monthly_data_list = monthly_rows_from_cents(cents, first_month)
+
+    component_totals_cents = {
+        "financing": int(cents["financing_actual"].sum()),
+        "operation": int(cents["operation"].sum()),
+        "insurance": int(cents["insurance"].sum()),
+        "fuel": int(cents["fuel"].sum())
+    }
+    total_cents = sum(component_totals_cents.values())
+
+    return {
+        "monthly_data": monthly_data_list,
+        "total_lifetime_cost": cents_to_euros(total_cents),
+        "component_totals": {key: cents_to_euros(value) for key, value in component_totals_cents.items()},
+        "total_lifetime_cost_cents": total_cents,
+        "component_totals_cents": component_totals_cents
+    }
+
+
+def sum_totals_cents(results) -> dict:
+    """
+    Summiert die Cent-Gesamtsummen vieler Ergebnisse (aus dem Cent-Modus) exakt auf.
+
+    Returns:
+        dict: Ganze Cent je Komponente sowie "total".
+    """
+    sums = {key: 0 for key in COST_COMPONENTS}
+    total = 0
+    for result in results:
+        for key in COST_COMPONENTS:
+            sums[key] += result["component_totals_cents"][key]
+        total += result["total_lifetime_cost_cents"]
+    sums["total"] = total
+    return sums
+
+
+def calculate_totals_cents(parameter_sets: list, chunk_size: int = 1024) -> dict:
+    """
+    Berechnet nur die Gesamtsummen vieler Konfigurationen im Cent-Modus, ohne Monatslisten aufzubauen.
+
+    Gedacht für große Flotten: Die Konfigurationen werden in Blöcken zu chunk_size
+    ausgewertet, der Speicherbedarf hängt daher nicht von der Flottengröße ab. Die Summen
+    stimmen exakt mit denen von calculate_batch(..., exact_cents=True) überein.
+
+    Args:
+        parameter_sets (list): Parameter-Dicts im Format der data.json.
+        chunk_size (int): Konfigurationen pro vektorisierter Auswertung.
+
+    Returns:
+        dict: int64-Arrays (eine Zeile je Konfiguration) je Komponente sowie "total".
+    """
+    totals = {key: np.zeros(len(parameter_sets), dtype=np.int64) for key in COST_COMPONENTS}
+    for chunk_start in range(0, len(parameter_sets), chunk_size):
+        chunk = parameter_sets[chunk_start:chunk_start + chunk_size]
+        calculators = [CostCalculator.from_parameters(p) for p in chunk]
+        for months, indices in _group_by_lifetime(chunk).items():
+            matrix = _monthly_component_matrix([calculators[i] for i in indices], 1, months)
+            rows = chunk_start + np.array(indices)
+            for key, source in (("financing", "financing_actual"), ("operation", "operation"),
+                                ("insurance", "insurance"), ("fuel", "fuel")):
+                totals[key][rows] = to_cents(matrix[source]).sum(axis=1)
+    totals["total"] = totals["financing"] + totals["operation"] + totals["insurance"] + totals["fuel"]
+    return totals
+
+
+def calculate_batch(parameter_sets: list, exact_cents: bool = False) -> list:
+    """
+    Berechnet viele Konfigurationen in wenigen vektorisierten Auswertungen.
+
+    Konfigurationen mit gleicher Haltedauer werden gemeinsam als eine Matrix berechnet.
+    So wird keine Konfiguration auf eine längere Haltedauer aufgefüllt, und eine einzelne
+    sehr lange Haltedauer verlangsamt die übrigen Konfigurationen nicht.
+    Die Funktion ist modulweit definiert, damit sie in einem ProcessPoolExecutor laufen kann.
+
+    Args:
+        parameter_sets (list): Parameter-Dicts im Format der data.json.
+        exact_cents (bool): Ganzzahliger Cent-Modus (siehe _breakdown_from_cents).
+
+    Returns:
+        list: Je Konfiguration ein Ergebnis-Dict wie von get_cost_breakdown_for_chart,
+              in der Reihenfolge von parameter_sets.
+    """
+    calculators = [CostCalculator.from_parameters(p) for p in parameter_sets]
+    build = _breakdown_from_cents if exact_cents else _breakdown_from_components
+
+    results = [None] * len(parameter_sets)
+    for months, indices in _group_by_lifetime(parameter_sets).items():
+        matrix = _monthly_component_matrix([calculators[i] for i in indices], 1, months)
+        if exact_cents:
+            matrix = _components_to_cents(matrix)
+        for row, index in enumerate(indices):
+            results[index] = build({key: values[row] for key, values in matrix.items()})
+    return results
+
+
+def _group_by_lifetime(parameter_sets: list) -> dict:
+    """Ordnet die Positionen in parameter_sets nach Haltedauer in Monaten: {Monate: [Positionen]}."""
+    groups = {}
+    for index, p in enumerate(parameter_sets):
+        months = max(int({**PARAMETER_DEFAULTS, **p}["usage_car_lifetime_years"]) * 12, 0)
+        groups.setdefault(months, []).append(index)
+    return groups
@@ -0,0 +1,61 @@
+# src/chart.py
+import math
+import numpy as np
+
+# Reihenfolge, Beschriftung und Farbe der gestapelten Balken
+CHART_SERIES = (
+    ("financing", "Finanzierung", "skyblue"),
+    ("operation", "Betriebskosten", "orange"),
+    ("insurance", "Versicherung", "lightcoral"),
+    ("fuel", "Kraftstoff", "green"),
+)
+
+
+def plot_monthly_costs(ax, monthly_data_list: list, visible_components=None, title: str = "Monatliche Autokosten (Auswahl)"):
+    """
+    Zeichnet die monatlichen Kosten als gestapeltes Balkendiagramm in eine Matplotlib-Achse.
+
+    Wird von der GUI (FigureCanvasTkAgg) und vom Report-Export (Agg/PNG) gemeinsam genutzt.
+
+    Args:
+        ax: Matplotlib-Achse, in die gezeichnet wird.
+        monthly_data_list (list): "monthly_data" aus CostCalculator.get_cost_breakdown_for_chart.
+        visible_components (set): Anzuzeigende Komponenten; None zeigt alle an.
+        title (str): Diagrammtitel.
+    """
+    if visible_components is None:
+        visible_components = {key for key, _, _ in CHART_SERIES}
+
+    months = [item['month'] for item in monthly_data_list]
+    bar_width = 0.8
+    current_bottom = np.zeros(len(months))
+    legend_handles = []
+    for key, label, color in CHART_SERIES:
+        if key not in visible_components:
+            continue
+        costs = np.array([item.get(key, 0) for item in monthly_data_list])
+        bars = ax.bar(months, costs, bar_width, label=label, color=color, bottom=current_bottom)
+        current_bottom += costs
+        legend_handles.append(bars)
+
+    ax.set_ylabel("Kosten (€)")
+    ax.set_title(title)
+    if legend_handles:
+        ax.legend(handles=legend_handles, loc='upper left', fontsize='small')
+    num_months_total = len(months)
+    year_major_ticks = [m for m in months if (m - 1) % 12 == 0]
+    if not year_major_ticks or (1 in months and year_major_ticks[0] != 1):
+        year_major_ticks = [1] + [yt for yt in year_major_ticks if yt != 1]
+    year_major_ticks = sorted(list(set(year_major_ticks)))
+    year_labels = [f'Jahr {(m-1)//12 + 1}' for m in year_major_ticks]
+    max_year_labels = 12
+    if len(year_labels) > max_year_labels and max_year_labels > 0:
+        step = math.ceil(len(year_labels) / max_year_labels)
+        year_major_ticks = year_major_ticks[::step]
+        year_labels = year_labels[::step]
+    ax.set_xticks(year_major_ticks)
+    ax.set_xticklabels(year_labels, rotation=30, ha='right', fontsize='small')
+    ax.set_xlabel("Zeitverlauf", fontsize='medium')
+    if num_months_total <= 36 and num_months_total > 0:
+        ax.set_xticks(months, minor=True)
+        ax.tick_params(axis='x', which='minor', labelsize='x-small', labelrotation=90)
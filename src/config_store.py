@@ -0,0 +1,359 @@
+# src/config_store.py
+import json
+import os
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def resource_path(relative_path):
+    """ Den absoluten Pfad zu einer Ressource ermitteln, funktioniert für Dev und für PyInstaller """
+    try:
+        # PyInstaller erstellt einen temporären Ordner und speichert den Pfad in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        # Im Entwicklungsmodus: Pfad relativ zum Projektstammverzeichnis
+        # Annahme: config_store.py ist in src/, Projektstamm ist ein Level höher
+        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+    return os.path.join(base_path, relative_path)
+
+# Globale Konstante für den Pfad zur data.json
+DATA_FILE_PATH = resource_path('data.json')
+# Append-only Versionsprotokoll aller Konfigurationen (ersetzt data.json als Standardspeicher)
+HISTORY_FILE_PATH = resource_path('data_history.jsonl')
+
+
+class ConfigStore:
+    def __init__(self, filepath: str = DATA_FILE_PATH):
+        """
+        Initialisiert den Speicher für benannte Fahrzeugkonfigurationen.
+
+        Der Speicher kennt weder Tkinter noch Dialoge: Lese- und Schreibfehler
+        werden als Exceptions (json.JSONDecodeError, IOError) an den Aufrufer
+        weitergereicht, damit GUI und Service sie jeweils passend anzeigen können.
+
+        Args:
+            filepath (str): Pfad zur JSON-Datei mit den Konfigurationen.
+        """
+        self.filepath = filepath
+
+    def load_all(self) -> dict:
+        """Gibt alle gespeicherten Konfigurationen als Dict {Name: Parameter} zurück."""
+        if not os.path.exists(self.filepath):
+            return {}
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_all(self, configs: dict):
+        """Schreibt alle Konfigurationen vollständig in die Datei."""
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            json.dump(configs, f, indent=4, ensure_ascii=False)
+
+    def names(self) -> list:
+        """Gibt die Namen aller gespeicherten Konfigurationen sortiert zurück."""
+        return sorted(self.load_all().keys())
+
+    def get(self, name: str):
+        """Gibt die Parameter einer Konfiguration zurück oder None, falls unbekannt."""
+        return self.load_all().get(name)
+
+    def save(self, name: str, params: dict):
+        """Speichert (oder überschreibt) eine einzelne Konfiguration."""
+        all_configs = self.load_all()
+        all_configs[name] = params
+        self.save_all(all_configs)
+
+    def delete(self, name: str) -> bool:
+        """Löscht eine Konfiguration. Gibt False zurück, wenn sie nicht existierte."""
+        all_configs = self.load_all()
+        if name not in all_configs:
+            return False
+        del all_configs[name]
+        self.save_all(all_configs)
+        return True
+
+
+class _LogEntry:
+    __slots__ = ("version", "op", "offset", "snapshot_index", "ts")
+
+    def __init__(self, version: int, op: str, offset: int, snapshot_index: int, ts: str):
+        self.version = version
+        self.op = op
+        self.offset = offset
+        self.snapshot_index = snapshot_index
+        self.ts = ts
+
+
+class VersionedConfigStore(ConfigStore):
+    def __init__(self,
+                 filepath: str = HISTORY_FILE_PATH,
+                 legacy_filepath: str = DATA_FILE_PATH,
+                 snapshot_interval: int = 16,
+                 cache_size: int = 256):
+        """
+        Konfigurationsspeicher mit Versionsgeschichte in einer append-only JSON-Lines-Datei.
+
+        Jede Speicherung hängt nur eine Zeile an: meist ein kompaktes Diff zur Vorversion
+        ("set"/"unset"), spätestens alle snapshot_interval Versionen einen vollständigen
+        Snapshot. Beim Öffnen werden nur Byte-Offsets indiziert; Parameter werden erst bei
+        Bedarf gelesen, ab dem letzten Snapshot. Dadurch kostet das Rekonstruieren
+        höchstens snapshot_interval Diffs, unabhängig von der Länge der Geschichte.
+
+        Mehrere Prozesse (z.B. GUI und Service) dürfen dieselbe Datei gleichzeitig verwenden:
+        Schreibvorgänge halten eine exklusive Sperre auf filepath + ".lock", während sie neue
+        Zeilen anderer Prozesse einlesen, die Versionsnummer vergeben und anhängen.
+
+        Zeilenformat:
+            {"op": "snapshot", "name": ..., "version": n, "ts": ..., "params": {...}}
+            {"op": "diff",     "name": ..., "version": n, "ts": ..., "set": {...}, "unset": [...]}
+            {"op": "delete",   "name": ..., "version": n, "ts": ...}
+
+        Args:
+            filepath (str): Pfad zum Versionsprotokoll.
+            legacy_filepath (str): Alte data.json; wird beim ersten Öffnen als Version 1 übernommen.
+            snapshot_interval (int): Maximale Anzahl Diffs zwischen zwei Snapshots.
+            cache_size (int): Anzahl zwischengespeicherter rekonstruierter Versionen.
+        """
+        super().__init__(filepath)
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.cache_size = cache_size
+        self._index = {}
+        self._indexed_size = 0
+        self._cache = OrderedDict()
+        if not os.path.exists(filepath) and legacy_filepath and os.path.exists(legacy_filepath):
+            with self._write_lock():
+                # Unter der Sperre erneut prüfen: ein anderer Prozess könnte die Übernahme schon erledigt haben.
+                if not os.path.exists(filepath):
+                    self._import_legacy(legacy_filepath)
+
+    # --- Öffentliche Schnittstelle (kompatibel zu ConfigStore) ---
+
+    def load_all(self) -> dict:
+        self._refresh_index()
+        return {name: self._materialize(name, len(entries) - 1)
+                for name, entries in self._index.items() if entries[-1].op != "delete"}
+
+    def save_all(self, configs: dict):
+        """Gleicht den Speicher mit configs ab; nur geänderte Konfigurationen erhalten eine neue Version."""
+        current = self.load_all()
+        for name in current:
+            if name not in configs:
+                self.delete(name)
+        for name, params in configs.items():
+            self.save(name, params)
+
+    def names(self) -> list:
+        self._refresh_index()
+        return sorted(name for name, entries in self._index.items() if entries[-1].op != "delete")
+
+    def get(self, name: str):
+        self._refresh_index()
+        entries = self._index.get(name)
+        if not entries:
+            return None
+        return self._materialize(name, len(entries) - 1)
+
+    def save(self, name: str, params: dict) -> int:
+        """
+        Speichert eine neue Version, falls sich die Parameter geändert haben.
+
+        Returns:
+            int: Die nun aktuelle Versionsnummer.
+        """
+        with self._write_lock():
+            return self._save_locked(name, params)
+
+    def delete(self, name: str) -> bool:
+        with self._write_lock():
+            self._refresh_index()
+            entries = self._index.get(name)
+            if not entries or entries[-1].op == "delete":
+                return False
+            self._append({"op": "delete", "name": name, "version": entries[-1].version + 1, "ts": self._now()})
+            return True
+
+    # --- Versionsgeschichte ---
+
+    def history(self, name: str) -> list:
+        """Gibt die Versionen einer Konfiguration als Liste von {"version", "op", "ts"} zurück."""
+        self._refresh_index()
+        return [{"version": e.version, "op": e.op, "ts": e.ts} for e in self._index.get(name, [])]
+
+    def get_version(self, name: str, version: int):
+        """
+        Rekonstruiert eine ältere Version. Gibt None zurück, wenn es sie nicht gibt
+        oder die Konfiguration in dieser Version gelöscht war.
+        """
+        self._refresh_index()
+        entries = self._index.get(name, [])
+        position = version - entries[0].version if entries else -1
+        if not 0 <= position < len(entries) or entries[position].version != version:
+            return None
+        return self._materialize(name, position)
+
+    # --- Interna ---
+
+    def _now(self) -> str:
+        return datetime.now().isoformat(timespec="seconds")
+
+    def _save_locked(self, name: str, params: dict) -> int:
+        self._refresh_index()
+        entries = self._index.get(name, [])
+        previous = self._materialize(name, len(entries) - 1) if entries else None
+        if previous == params:
+            return entries[-1].version
+
+        version = entries[-1].version + 1 if entries else 1
+        record = {"op": "snapshot", "name": name, "version": version, "ts": self._now()}
+        diffs_since_snapshot = len(entries) - 1 - entries[-1].snapshot_index if entries else 0
+        if previous is not None and diffs_since_snapshot + 1 < self.snapshot_interval:
+            changed = {k: v for k, v in params.items() if k not in previous or previous[k] != v}
+            removed = [k for k in previous if k not in params]
+            if len(changed) + len(removed) < len(params):
+                record["op"] = "diff"
+                record["set"] = changed
+                if removed:
+                    record["unset"] = removed
+        if record["op"] == "snapshot":
+            record["params"] = params
+
+        self._append(record)
+        self._remember(name, version, dict(params))
+        return version
+
+    def _import_legacy(self, legacy_filepath: str):
+        with open(legacy_filepath, 'r', encoding='utf-8') as f:
+            legacy_configs = json.load(f)
+        for name, params in legacy_configs.items():
+            self._save_locked(name, params)
+
+    @contextmanager
+    def _write_lock(self):
+        """Exklusive Sperre über alle Prozesse, die dieses Protokoll beschreiben."""
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.filepath + ".lock", 'a+b') as lock_file:
+            _lock_file(lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file)
+
+    def _refresh_index(self):
+        """Indiziert neu angehängte Zeilen (auch von anderen Prozessen) ab dem letzten bekannten Offset."""
+        if not os.path.exists(self.filepath):
+            return
+        if os.path.getsize(self.filepath) == self._indexed_size:
+            return
+        with open(self.filepath, 'rb') as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Unvollständige letzte Zeile (z.B. abgebrochener Schreibvorgang): noch nicht indizieren.
+                    break
+                self._index_line(line, offset)
+                offset += len(line)
+            self._indexed_size = offset
+
+    def _index_line(self, line: bytes, offset: int):
+        try:
+            record = json.loads(line)
+            name, version, op = record["name"], int(record["version"]), record["op"]
+        except (ValueError, KeyError, TypeError):
+            return
+        entries = self._index.setdefault(name, [])
+        if entries and version != entries[-1].version + 1:
+            return
+        position = len(entries)
+        if op == "snapshot" or op == "delete" or not entries:
+            snapshot_index = position
+        else:
+            snapshot_index = entries[-1].snapshot_index
+        entries.append(_LogEntry(version, op, offset, snapshot_index, record.get("ts", "")))
+
+    def _append(self, record: dict):
+        """Hängt eine Zeile an; nur unter _write_lock nach _refresh_index aufrufen."""
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.filepath, 'ab') as f:
+            if f.tell() > self._indexed_size:
+                # Reste einer unvollständigen Zeile abschließen, damit die neue Zeile lesbar bleibt.
+                f.write(b"\n")
+            f.write(line)
+        self._refresh_index()
+
+    def _read_record(self, f, offset: int) -> dict:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+    def _materialize(self, name: str, position: int):
+        entries = self._index[name]
+        entry = entries[position]
+        if entry.op == "delete":
+            return None
+        cached = self._cache.get((name, entry.version))
+        if cached is not None:
+            self._cache.move_to_end((name, entry.version))
+            return dict(cached)
+
+        start = entry.snapshot_index
+        params = None
+        # Eine zwischengespeicherte Version seit dem letzten Snapshot erspart das Lesen ab dem Snapshot.
+        for pos in range(position - 1, start - 1, -1):
+            hit = self._cache.get((name, entries[pos].version))
+            if hit is not None:
+                params, start = dict(hit), pos + 1
+                break
+
+        with open(self.filepath, 'rb') as f:
+            for pos in range(start, position + 1):
+                record = self._read_record(f, entries[pos].offset)
+                if record["op"] == "snapshot" or params is None:
+                    params = dict(record.get("params", {}))
+                else:
+                    params.update(record.get("set", {}))
+                    for key in record.get("unset", []):
+                        params.pop(key, None)
+
+        self._remember(name, entry.version, params)
+        return dict(params)
+
+    def _remember(self, name: str, version: int, params: dict):
+        self._cache[(name, version)] = params
+        self._cache.move_to_end((name, version))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def open_config_store(filepath: str = HISTORY_FILE_PATH) -> ConfigStore:
+    """
+    Öffnet den passenden Speicher: eine .json-Datei als einfachen ConfigStore,
+    alles andere (Standard: data_history.jsonl) als VersionedConfigStore.
+    """
+    if filepath.lower().endswith(".json"):
+        return ConfigStore(filepath)
+    # Nur der Standardspeicher übernimmt beim ersten Start die alte data.json.
+    legacy_filepath = DATA_FILE_PATH if os.path.abspath(filepath) == HISTORY_FILE_PATH else None
+    return VersionedConfigStore(filepath, legacy_filepath=legacy_filepath)
@@ -1,16 +1,15 @@
 # src/gui.py
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import numpy as np
 import json
-import math
-import sys
-import os
 
 from .car import Car
 from .financing import Financing
 from .calculator import CostCalculator
 from .insurance import Insurance
+from .config_store import VersionedConfigStore, DATA_FILE_PATH, HISTORY_FILE_PATH
+from .chart import plot_monthly_costs
+from .parameters import ParameterValidator
 
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -19,24 +18,6 @@ from matplotlib.ticker import FuncFormatter
 
 
 
-def resource_path(relative_path):
-    """ Den absoluten Pfad zu einer Ressource ermitteln, funktioniert für Dev und für PyInstaller """
-    try:
-        # PyInstaller erstellt einen temporären Ordner und speichert den Pfad in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        # Im Entwicklungsmodus: Pfad relativ zum Projektstammverzeichnis
-        # Annahme: gui.py ist in src/, Projektstamm ist ein Level höher
-        # Wenn dein DATA_FILE_PATH und main.py im Stammverzeichnis sind,
-        # und gui.py in src/, dann ist dieser Pfad für den Entwicklungsmodus korrekt.
-        base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-
-    return os.path.join(base_path, relative_path)
-
-# Globale Konstante für den Pfad zur data.json
-DATA_FILE_PATH = resource_path('data.json')
-
-
 # DATA_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data.json'))
 
 
@@ -74,37 +55,61 @@ class CarCostGUI:
         self.saved_configs_list = []
         
         self.calculation_results_buffer = {}
+        # Jede Speicherung hängt nur ein Diff an das Versionsprotokoll an; eine vorhandene data.json wird übernommen.
+        try:
+            self.config_store = VersionedConfigStore(HISTORY_FILE_PATH, legacy_filepath=DATA_FILE_PATH)
+        except (json.JSONDecodeError, IOError) as e:
+            messagebox.showerror("Fehler beim Übernehmen der Speicherdatei",
+                                 f"Konnte '{DATA_FILE_PATH}' nicht übernehmen.\n{e}")
+            self.config_store = VersionedConfigStore(HISTORY_FILE_PATH, legacy_filepath=None)
+        self.parameter_validator = ParameterValidator()
 
         self._setup_ui() 
         self._update_saved_configs_dropdown() 
 
     def _get_data_filepath(self):
-        return DATA_FILE_PATH
+        return self.config_store.filepath
 
-    def _read_data_file(self) -> dict:
+    def _read_config_names(self) -> list:
         filepath = self._get_data_filepath()
         try:
-            if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {} 
+            return self.config_store.names()
         except (json.JSONDecodeError, IOError) as e:
             messagebox.showerror("Fehler beim Lesen der Speicherdatei", 
                                  f"Konnte '{filepath}' nicht laden oder parsen.\n{e}")
-            return {}
+            return []
+
+    def _read_config(self, name: str):
+        filepath = self._get_data_filepath()
+        try:
+            return self.config_store.get(name)
+        except (json.JSONDecodeError, IOError) as e:
+            messagebox.showerror("Fehler beim Lesen der Speicherdatei", 
+                                 f"Konnte '{filepath}' nicht laden oder parsen.\n{e}")
+            return None
+
+    def _write_config(self, name: str, params: dict) -> bool:
+        # Hängt nur eine Version dieser einen Konfiguration an, statt alle neu zu schreiben.
+        filepath = self._get_data_filepath()
+        try:
+            self.config_store.save(name, params)
+            return True
+        except IOError as e:
+            messagebox.showerror("Fehler beim Schreiben der Speicherdatei",
+                                 f"Konnte nicht in '{filepath}' schreiben.\n{e}")
+            return False
 
-    def _write_data_file(self, data: dict):
+    def _delete_config(self, name: str) -> bool:
         filepath = self._get_data_filepath()
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            return self.config_store.delete(name)
         except IOError as e:
             messagebox.showerror("Fehler beim Schreiben der Speicherdatei",
                                  f"Konnte nicht in '{filepath}' schreiben.\n{e}")
+            return False
 
     def _update_saved_configs_dropdown(self):
-        all_configs = self._read_data_file()
-        self.saved_configs_list = sorted(list(all_configs.keys()))
+        self.saved_configs_list = self._read_config_names()
         self.combo_saved_configs['values'] = self.saved_configs_list
         if self.saved_configs_list:
             self.combo_saved_configs.current(0) 
@@ -112,35 +117,40 @@ class CarCostGUI:
             self.combo_saved_configs.set('')
             self.config_name_var.set("")
 
-    def _get_float_from_entry(self, entry_widget, default_value=0.0, error_title="Eingabefehler", field_name="Feld"):
-        try:
-            value_str = entry_widget.get().replace(",", ".")
-            if not value_str:
-                entry_widget.state(['!invalid'])
-                return default_value
-            val = float(value_str)
-            entry_widget.state(['!invalid'])
-            return val
-        except ValueError:
-            entry_widget.state(['invalid'])
-            messagebox.showerror(error_title, f"Ungültiger Wert für '{field_name}': '{entry_widget.get()}'. Bitte eine Zahl eingeben.")
-            entry_widget.focus_set()
-            raise ValueError(f"Ungültiger Wert für {field_name}")
+    def _parameter_entries(self) -> dict:
+        """Ordnet jedem Schlüssel des Parameter-Schemas sein Eingabefeld zu."""
+        return {
+            "car_purchase_price": self.entry_purchase_price,
+            "car_running_costs_monthly": self.entry_running_costs,
+            "insurance_annual_cost": self.entry_insurance_annual_cost,
+            "car_consumption_per_100km": self.entry_consumption,
+            "usage_km_per_year": self.entry_km_per_year,
+            "usage_fuel_price_per_liter": self.entry_fuel_price,
+            "usage_car_lifetime_years": self.entry_car_lifetime_years,
+            "general_operating_cost_increase_percent": self.entry_op_cost_increase,
+            "financing_interest_rate_percent": self.entry_interest_rate,
+            "financing_duration_years": self.entry_financing_duration,
+            "financing_balloon_payment": self.entry_balloon_payment,
+        }
 
-    def _get_int_from_entry(self, entry_widget, default_value=0, error_title="Eingabefehler", field_name="Feld"):
-        try:
-            value_str = entry_widget.get()
-            if not value_str:
-                entry_widget.state(['!invalid'])
-                return default_value
-            val = int(value_str)
-            entry_widget.state(['!invalid'])
-            return val
-        except ValueError:
-            entry_widget.state(['invalid'])
-            messagebox.showerror(error_title, f"Ungültiger Wert für '{field_name}': '{entry_widget.get()}'. Bitte eine ganze Zahl eingeben.")
-            entry_widget.focus_set()
-            raise ValueError(f"Ungültiger Wert für {field_name}")
+    def _validate_inputs(self, error_title="Eingabefehler") -> dict:
+        """
+        Liest alle Eingabefelder, validiert sie gemeinsam und markiert fehlerhafte Felder rot.
+
+        Bei Fehlern erscheint ein einziger Dialog mit allen Meldungen.
+
+        Raises:
+            ValueError: Wenn mindestens ein Feld ungültig ist.
+        """
+        entries = self._parameter_entries()
+        result = self.parameter_validator.validate({key: entry.get() for key, entry in entries.items()})
+        for key, entry in entries.items():
+            entry.state(['invalid'] if key in result.errors else ['!invalid'])
+        if not result.ok:
+            messagebox.showerror(error_title, result.error_message())
+            entries[next(iter(result.errors))].focus_set()
+            raise ValueError(f"Ungültige Werte für: {', '.join(result.errors)}")
+        return result.values
 
     def _setup_ui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -304,42 +314,18 @@ class CarCostGUI:
 
     def _trigger_calculation(self):
         try:
-            all_entries = [
-                self.entry_purchase_price, self.entry_running_costs, self.entry_insurance_annual_cost,
-                self.entry_consumption, self.entry_km_per_year, self.entry_fuel_price,
-                self.entry_car_lifetime_years, self.entry_op_cost_increase, self.entry_interest_rate,
-                self.entry_financing_duration, self.entry_balloon_payment
-            ]
-            for entry_widget in all_entries:
-                if isinstance(entry_widget, ttk.Entry):
-                    entry_widget.state(['!invalid'])
-
-            self.car_params.purchase_price = self._get_float_from_entry(self.entry_purchase_price, field_name="Kaufpreis")
-            self.car_params.running_costs_monthly = self._get_float_from_entry(self.entry_running_costs, field_name="Betriebskosten")
-            insurance_cost_val = self.insurance_annual_cost_var.get()
-            if insurance_cost_val < 0:
-                self.entry_insurance_annual_cost.state(['invalid']) 
-                messagebox.showerror("Fehler", "Versicherungskosten dürfen nicht negativ sein.")
-                return
-            self.insurance_params.annual_cost = insurance_cost_val
-            self.entry_insurance_annual_cost.state(['!invalid'])
-            self.car_params.consumption_per_100km = self._get_float_from_entry(self.entry_consumption, field_name="Verbrauch")
-            km_per_year_val = self.km_per_year_var.get()
-            fuel_price_val = self.fuel_price_var.get()
-            car_lifetime_val = self.car_lifetime_years_var.get()
-            op_cost_increase_val = self.operating_cost_increase_var.get()
-            self.financing_params.interest_rate_percent = self._get_float_from_entry(self.entry_interest_rate, field_name="Zinssatz")
-            self.financing_params.duration_years = self._get_int_from_entry(self.entry_financing_duration, field_name="Finanzierungsdauer")
-            balloon_payment_val = self.balloon_payment_var.get()
-            if balloon_payment_val < 0:
-                self.entry_balloon_payment.state(['invalid'])
-                messagebox.showerror("Fehler", "Schlussrate darf nicht negativ sein.")
-                return
-            self.financing_params.balloon_payment = balloon_payment_val
-            self.entry_balloon_payment.state(['!invalid'])
-            if car_lifetime_val <= 0:
-                 messagebox.showerror("Fehler", "Haltedauer muss größer als 0 sein.")
-                 return
+            params = self._validate_inputs()
+            self.car_params.purchase_price = params["car_purchase_price"]
+            self.car_params.running_costs_monthly = params["car_running_costs_monthly"]
+            self.car_params.consumption_per_100km = params["car_consumption_per_100km"]
+            self.insurance_params.annual_cost = params["insurance_annual_cost"]
+            self.financing_params.interest_rate_percent = params["financing_interest_rate_percent"]
+            self.financing_params.duration_years = params["financing_duration_years"]
+            self.financing_params.balloon_payment = params["financing_balloon_payment"]
+            km_per_year_val = params["usage_km_per_year"]
+            fuel_price_val = params["usage_fuel_price_per_liter"]
+            car_lifetime_val = params["usage_car_lifetime_years"]
+            op_cost_increase_val = params["general_operating_cost_increase_percent"]
 
             calculator = CostCalculator(
                 car=self.car_params,
@@ -408,50 +394,12 @@ class CarCostGUI:
         try:
             fig = Figure(figsize=(7, 5), dpi=100) 
             ax = fig.add_subplot(111)
-            months = [item['month'] for item in monthly_data_list]
-            financing_costs = np.array([item.get('financing',0) for item in monthly_data_list]) if self.show_financing_var.get() else np.zeros(len(months))
-            operation_costs = np.array([item.get('operation',0) for item in monthly_data_list]) if self.show_operation_var.get() else np.zeros(len(months))
-            insurance_costs = np.array([item.get('insurance',0) for item in monthly_data_list]) if self.show_insurance_var.get() else np.zeros(len(months))
-            fuel_costs      = np.array([item.get('fuel',0) for item in monthly_data_list])      if self.show_fuel_var.get() else np.zeros(len(months))
-            bar_width = 0.8
-            current_bottom = np.zeros(len(months))
-            legend_handles = []
-            if self.show_financing_var.get():
-                p1 = ax.bar(months, financing_costs, bar_width, label='Finanzierung', color='skyblue', bottom=current_bottom)
-                current_bottom += financing_costs
-                legend_handles.append(p1)
-            if self.show_operation_var.get():
-                p2 = ax.bar(months, operation_costs, bar_width, label='Betriebskosten', color='orange', bottom=current_bottom)
-                current_bottom += operation_costs
-                legend_handles.append(p2)
-            if self.show_insurance_var.get():
-                p3 = ax.bar(months, insurance_costs, bar_width, label='Versicherung', color='lightcoral', bottom=current_bottom)
-                current_bottom += insurance_costs
-                legend_handles.append(p3)
-            if self.show_fuel_var.get():
-                p4 = ax.bar(months, fuel_costs, bar_width, label='Kraftstoff', color='green', bottom=current_bottom)
-                legend_handles.append(p4)
-            ax.set_ylabel("Kosten (€)")
-            ax.set_title("Monatliche Autokosten (Auswahl)")
-            if legend_handles: 
-                ax.legend(handles=legend_handles, loc='upper left', fontsize='small')
-            num_months_total = len(months)
-            year_major_ticks = [m for m in months if (m - 1) % 12 == 0]
-            if not year_major_ticks or (1 in months and year_major_ticks[0] != 1) :
-                 year_major_ticks = [1] + [yt for yt in year_major_ticks if yt !=1]
-            year_major_ticks = sorted(list(set(year_major_ticks)))
-            year_labels = [f'Jahr {(m-1)//12 + 1}' for m in year_major_ticks]
-            max_year_labels = 12 
-            if len(year_labels) > max_year_labels and max_year_labels > 0: 
-                step = math.ceil(len(year_labels) / max_year_labels)
-                year_major_ticks = year_major_ticks[::step]
-                year_labels = year_labels[::step]
-            ax.set_xticks(year_major_ticks)
-            ax.set_xticklabels(year_labels, rotation=30, ha='right', fontsize='small')
-            ax.set_xlabel("Zeitverlauf", fontsize='medium')
-            if num_months_total <= 36 and num_months_total > 0 : 
-                ax.set_xticks(months, minor=True)
-                ax.tick_params(axis='x', which='minor', labelsize='x-small', labelrotation=90)
+            visible_components = {
+                key for key, var in (("financing", self.show_financing_var), ("operation", self.show_operation_var),
+                                     ("insurance", self.show_insurance_var), ("fuel", self.show_fuel_var))
+                if var.get()
+            }
+            plot_monthly_costs(ax, monthly_data_list, visible_components)
             fig.tight_layout()
             canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
             canvas_widget = canvas.get_tk_widget()
@@ -465,20 +413,8 @@ class CarCostGUI:
             tk.Label(self.chart_frame, text=f"Fehler beim Erstellen des Diagramms: {e}").pack(expand=True, fill="both")
 
     def _collect_parameters_for_saving(self) -> dict:
-        params_to_save = {
-            "car_purchase_price": self._get_float_from_entry(self.entry_purchase_price, field_name="Kaufpreis"),
-            "car_running_costs_monthly": self._get_float_from_entry(self.entry_running_costs, field_name="Betriebskosten"),
-            "car_consumption_per_100km": self._get_float_from_entry(self.entry_consumption, field_name="Verbrauch"),
-            "financing_interest_rate_percent": self._get_float_from_entry(self.entry_interest_rate, field_name="Zinssatz"),
-            "financing_duration_years": self._get_int_from_entry(self.entry_financing_duration, field_name="Finanzierungsdauer"),
-            "financing_balloon_payment": self.balloon_payment_var.get(),
-            "insurance_annual_cost": self.insurance_annual_cost_var.get(),
-            "usage_km_per_year": self.km_per_year_var.get(),
-            "usage_fuel_price_per_liter": self.fuel_price_var.get(),
-            "usage_car_lifetime_years": self.car_lifetime_years_var.get(),
-            "general_operating_cost_increase_percent": self.operating_cost_increase_var.get(),
-        }
-        return params_to_save
+        # Unveränderte Felder kommen aus dem Cache des Validators und werden nicht erneut geparst.
+        return dict(self._validate_inputs(error_title="Fehler beim Speichern"))
 
     def _save_current_configuration(self):
         config_name = self.config_name_var.get().strip()
@@ -488,14 +424,13 @@ class CarCostGUI:
             return
         try:
             current_params = self._collect_parameters_for_saving()
-            all_configs = self._read_data_file()
-            if config_name in all_configs:
+            if config_name in self._read_config_names():
                 if not messagebox.askyesno("Überschreiben", 
                                            f"Die Konfiguration '{config_name}' existiert bereits.\n"
                                            "Möchten Sie sie überschreiben?"):
                     return
-            all_configs[config_name] = current_params
-            self._write_data_file(all_configs)
+            if not self._write_config(config_name, current_params):
+                return
             messagebox.showinfo("Gespeichert", f"Konfiguration '{config_name}' erfolgreich gespeichert.")
             self._update_saved_configs_dropdown()
             if config_name in self.saved_configs_list:
@@ -514,12 +449,10 @@ class CarCostGUI:
 
         if messagebox.askyesno("Löschen bestätigen", 
                                f"Sind Sie sicher, dass Sie die Konfiguration '{selected_name}' unwiderruflich löschen möchten?"):
-            all_configs = self._read_data_file()
-            if selected_name in all_configs:
-                del all_configs[selected_name]
-                self._write_data_file(all_configs)
-                messagebox.showinfo("Gelöscht", f"Konfiguration '{selected_name}' wurde gelöscht.")
-                self.config_name_var.set("") 
+            if selected_name in self._read_config_names():
+                if self._delete_config(selected_name):
+                    messagebox.showinfo("Gelöscht", f"Konfiguration '{selected_name}' wurde gelöscht.")
+                    self.config_name_var.set("") 
             else:
                 messagebox.showwarning("Fehler", f"Konfiguration '{selected_name}' wurde nicht in der Speicherdatei gefunden.")
             
@@ -531,8 +464,7 @@ class CarCostGUI:
         if not selected_name:
             messagebox.showinfo("Laden", "Bitte wählen Sie eine Konfiguration aus der Liste aus.")
             return
-        all_configs = self._read_data_file()
-        loaded_params = all_configs.get(selected_name)
+        loaded_params = self._read_config(selected_name)
         if not loaded_params:
             messagebox.showerror("Fehler beim Laden", f"Konfiguration '{selected_name}' nicht in der Datei gefunden.")
             self._update_saved_configs_dropdown()
@@ -555,15 +487,8 @@ class CarCostGUI:
             self.car_lifetime_years_var.set(loaded_params.get("usage_car_lifetime_years", 10))
             self.operating_cost_increase_var.set(loaded_params.get("general_operating_cost_increase_percent", 2.0))
             self.config_name_var.set(selected_name)
-            all_entries = [
-                self.entry_purchase_price, self.entry_running_costs, self.entry_insurance_annual_cost,
-                self.entry_consumption, self.entry_km_per_year, self.entry_fuel_price,
-                self.entry_car_lifetime_years, self.entry_op_cost_increase, self.entry_interest_rate,
-                self.entry_financing_duration, self.entry_balloon_payment
-            ]
-            for entry_widget in all_entries:
-                if isinstance(entry_widget, ttk.Entry):
-                    entry_widget.state(['!invalid'])
+            for entry_widget in self._parameter_entries().values():
+                entry_widget.state(['!invalid'])
             messagebox.showinfo("Geladen", f"Konfiguration '{selected_name}' erfolgreich geladen.")
             self._trigger_calculation()
         except Exception as e:
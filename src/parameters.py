@@ -0,0 +1,204 @@
+# src/parameters.py
+import csv
+import math
+
+from .calculator import PARAMETER_DEFAULTS
+
+# Obergrenze der Haltedauer: begrenzt Rechenzeit und Speicher einer Auswertung (Monate x Konfigurationen)
+MAX_LIFETIME_YEARS = 100
+
+
+class ParameterField:
+    def __init__(self, key: str, label: str, value_type=float, min_value=None, min_exclusive: bool = False,
+                 max_value=None):
+        """
+        Beschreibt einen Eingabeparameter unabhängig von einem Tk-Widget.
+
+        Args:
+            key (str): Schlüssel im Parameter-Dict (Format der data.json).
+            label (str): Anzeigename für Fehlermeldungen.
+            value_type (type): float oder int.
+            min_value (float): Optionale Untergrenze.
+            min_exclusive (bool): True, wenn der Wert echt größer als min_value sein muss.
+            max_value (float): Optionale Obergrenze (einschließlich).
+        """
+        self.key = key
+        self.label = label
+        self.value_type = value_type
+        self.default = PARAMETER_DEFAULTS[key]
+        self.min_value = min_value
+        self.min_exclusive = min_exclusive
+        self.max_value = max_value
+
+    def parse(self, raw):
+        """
+        Wandelt eine Eingabe (Text aus Widget/CSV oder Zahl aus JSON) in den Zielwert um.
+
+        Leere oder fehlende Eingaben ergeben den Standardwert. Ein Komma wird als
+        Dezimaltrennzeichen akzeptiert; unendliche Werte und NaN werden abgelehnt.
+
+        Raises:
+            ValueError: Mit einer für den Benutzer lesbaren Meldung.
+        """
+        if raw is None or (isinstance(raw, str) and not raw.strip()):
+            return self.default
+
+        if isinstance(raw, bool):
+            raise ValueError(self._type_error(raw))
+        if isinstance(raw, (int, float)):
+            value = raw
+        else:
+            text = str(raw).strip()
+            try:
+                value = int(text) if self.value_type is int else float(text.replace(",", "."))
+            except ValueError:
+                raise ValueError(self._type_error(raw))
+
+        # "inf"/"nan" (bzw. Infinity/NaN aus JSON) sind für float() gültig, aber keine Beträge
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(self._type_error(raw))
+
+        if self.value_type is int:
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError(self._type_error(raw))
+            value = int(value)
+        else:
+            value = float(value)
+
+        if self.min_value is not None:
+            if self.min_exclusive and value <= self.min_value:
+                raise ValueError(f"{self.label} muss größer als {self.min_value} sein.")
+            if not self.min_exclusive and value < self.min_value:
+                raise ValueError(f"{self.label} darf nicht negativ sein." if self.min_value == 0
+                                 else f"{self.label} muss mindestens {self.min_value} sein.")
+        if self.max_value is not None and value > self.max_value:
+            raise ValueError(f"{self.label} darf höchstens {self.max_value} sein.")
+        return value
+
+    def _type_error(self, raw) -> str:
+        expected = "eine ganze Zahl" if self.value_type is int else "eine Zahl"
+        return f"Ungültiger Wert für '{self.label}': '{raw}'. Bitte {expected} eingeben."
+
+
+# Alle Eingabeparameter in der Reihenfolge der Eingabemaske
+PARAMETER_SCHEMA = (
+    ParameterField("car_purchase_price", "Kaufpreis"),
+    ParameterField("car_running_costs_monthly", "Betriebskosten"),
+    ParameterField("insurance_annual_cost", "Versicherungskosten", min_value=0),
+    ParameterField("car_consumption_per_100km", "Verbrauch"),
+    ParameterField("usage_km_per_year", "Jahreskilometerleistung"),
+    ParameterField("usage_fuel_price_per_liter", "Kraftstoffpreis"),
+    ParameterField("usage_car_lifetime_years", "Haltedauer", value_type=int, min_value=0, min_exclusive=True,
+                   max_value=MAX_LIFETIME_YEARS),
+    ParameterField("general_operating_cost_increase_percent", "Preissteigerung"),
+    ParameterField("financing_interest_rate_percent", "Zinssatz"),
+    ParameterField("financing_duration_years", "Finanzierungsdauer", value_type=int),
+    ParameterField("financing_balloon_payment", "Schlussrate", min_value=0),
+)
+
+
+class ValidationResult:
+    def __init__(self, values: dict, errors: dict):
+        """
+        Ergebnis einer Validierung.
+
+        Args:
+            values (dict): Gültig geparste Werte je Schlüssel.
+            errors (dict): Fehlermeldung je ungültigem Schlüssel (in Schema-Reihenfolge).
+        """
+        self.values = values
+        self.errors = errors
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def error_message(self) -> str:
+        """Alle Fehlermeldungen zeilenweise für einen einzigen Dialog."""
+        return "\n".join(self.errors.values())
+
+
+class ParameterValidator:
+    def __init__(self, schema=PARAMETER_SCHEMA):
+        """
+        Validiert alle Parameter in einem Durchlauf und merkt sich die geparsten Werte.
+
+        Ein Feld wird nur neu geparst, wenn sich seine Roheingabe seit dem letzten
+        Aufruf geändert hat. So kostet z.B. Speichern direkt nach Berechnen kein
+        erneutes Parsen.
+
+        Args:
+            schema (tuple): Die zu prüfenden ParameterField-Objekte.
+        """
+        self.schema = schema
+        self._cache = {}
+
+    def validate(self, raw_values: dict) -> ValidationResult:
+        """
+        Parst alle Felder des Schemas und sammelt sämtliche Fehler.
+
+        Args:
+            raw_values (dict): Roheingaben je Schlüssel; fehlende Schlüssel erhalten den Standardwert.
+        """
+        values = {}
+        errors = {}
+        for field in self.schema:
+            raw = raw_values.get(field.key)
+            cached = self._cache.get(field.key)
+            if cached is not None and cached[0] == raw and type(cached[0]) is type(raw):
+                _, value, error = cached
+            else:
+                try:
+                    value, error = field.parse(raw), None
+                except ValueError as e:
+                    value, error = None, str(e)
+                self._cache[field.key] = (raw, value, error)
+            if error is None:
+                values[field.key] = value
+            else:
+                errors[field.key] = error
+        return ValidationResult(values, errors)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+def validate_parameters(raw_values: dict) -> ValidationResult:
+    """Validiert ein einzelnes Parameter-Dict ohne Cache (z.B. für JSON-Anfragen)."""
+    return ParameterValidator().validate(raw_values)
+
+
+def read_parameters_csv(fileobj, name_column: str = "name"):
+    """
+    Liest Konfigurationen aus einer CSV-Datei und validiert jede Zeile mit demselben Schema wie die GUI.
+
+    Die Spalten heißen wie die Schlüssel der data.json; fehlende Spalten erhalten
+    den Standardwert. Trennzeichen (Komma/Semikolon) werden automatisch erkannt.
+
+    Args:
+        fileobj: Geöffnete Textdatei.
+        name_column (str): Spalte mit dem Konfigurationsnamen (optional).
+
+    Yields:
+        tuple: (Zeilennummer, Name, ValidationResult)
+
+    Raises:
+        ValueError: Bei unbekannten Spalten (z.B. Tippfehlern im Kopf), bevor eine Zeile gelesen wird;
+            sonst würden alle Zeilen still mit dem Standardwert für die gemeinte Spalte importiert.
+    """
+    sample = fileobj.read(4096)
+    fileobj.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(fileobj, dialect=dialect)
+    known_columns = {field.key for field in PARAMETER_SCHEMA} | {name_column}
+    unknown_columns = [column for column in reader.fieldnames or [] if column not in known_columns]
+    if unknown_columns:
+        raise ValueError(f"Unbekannte Spalte(n) in der CSV-Datei: {', '.join(unknown_columns)}. "
+                         f"Erlaubt sind {name_column} und {', '.join(field.key for field in PARAMETER_SCHEMA)}.")
+    validator = ParameterValidator()
+    for line_number, row in enumerate(reader, start=2):
+        name = (row.get(name_column) or "").strip() or f"Zeile {line_number}"
+        yield line_number, name, validator.validate(row)
@@ -0,0 +1,262 @@
+# src/report_export.py
+import argparse
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .calculator import calculate_batch, cents_to_euros, COST_COMPONENTS
+from .config_store import HISTORY_FILE_PATH, open_config_store
+from .parameters import read_parameters_csv
+
+MONTHLY_CSV_COLUMNS = ["config", "month"] + list(COST_COMPONENTS) + ["total"]
+TOTALS_CSV_COLUMNS = ["config"] + list(COST_COMPONENTS) + ["total_lifetime_cost"]
+
+# Pro Arbeitsprozess genau eine wiederverwendete Figure (siehe _init_render_worker)
+_worker_figure = None
+_worker_ax = None
+
+
+def iter_results(named_params, chunk_size: int = 256, exact_cents: bool = False):
+    """
+    Berechnet Konfigurationen blockweise und liefert (Name, Ergebnis)-Paare nacheinander.
+
+    Es liegen nie mehr als chunk_size Ergebnisse gleichzeitig im Speicher.
+
+    Args:
+        named_params: Iterable von (Name, Parameter-Dict).
+        chunk_size (int): Anzahl Konfigurationen pro vektorisierter Auswertung.
+        exact_cents (bool): Ganzzahliger Cent-Modus des Rechners verwenden.
+    """
+    chunk = []
+    for name, params in named_params:
+        chunk.append((name, params))
+        if len(chunk) >= chunk_size:
+            yield from zip((n for n, _ in chunk), calculate_batch([p for _, p in chunk], exact_cents))
+            chunk = []
+    if chunk:
+        yield from zip((n for n, _ in chunk), calculate_batch([p for _, p in chunk], exact_cents))
+
+
+def _monthly_rows(name: str, result: dict):
+    return (
+        [name, item["month"]] + [item[key] for key in COST_COMPONENTS] + [item["total"]]
+        for item in result["monthly_data"]
+    )
+
+
+def _totals_row(name: str, result: dict) -> list:
+    totals = result["component_totals"]
+    return [name] + [totals[key] for key in COST_COMPONENTS] + [result["total_lifetime_cost"]]
+
+
+def _json_entry(name: str, result: dict) -> dict:
+    return {
+        "config": name,
+        "total_lifetime_cost": result["total_lifetime_cost"],
+        "component_totals": result["component_totals"],
+        "monthly_data": result["monthly_data"],
+    }
+
+
+def export_reports(named_params, out_dir: str, formats=("csv",), chunk_size: int = 256,
+                   exact_cents: bool = False) -> list:
+    """
+    Exportiert Monatswerte und component_totals in einem einzigen Durchlauf über alle Konfigurationen.
+
+    Args:
+        named_params: Iterable von (Name, Parameter-Dict); wird nur einmal durchlaufen.
+        out_dir (str): Zielverzeichnis.
+        formats (tuple): Auswahl aus "csv" und "json".
+        chunk_size (int): Konfigurationen pro vektorisierter Auswertung.
+        exact_cents (bool): Im Cent-Modus rechnen; component_totals.csv erhält dann eine
+            abschließende Zeile "SUMME" mit der exakten Summe über alle Konfigurationen.
+
+    Returns:
+        list: Pfade der geschriebenen Dateien.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    files = []
+    try:
+        sinks = []
+        if "csv" in formats:
+            monthly_path = os.path.join(out_dir, "monthly_breakdown.csv")
+            totals_path = os.path.join(out_dir, "component_totals.csv")
+            monthly_file = open(monthly_path, "w", encoding="utf-8", newline="")
+            totals_file = open(totals_path, "w", encoding="utf-8", newline="")
+            files += [monthly_file, totals_file]
+            paths += [monthly_path, totals_path]
+            monthly_writer = csv.writer(monthly_file)
+            totals_writer = csv.writer(totals_file)
+            monthly_writer.writerow(MONTHLY_CSV_COLUMNS)
+            totals_writer.writerow(TOTALS_CSV_COLUMNS)
+
+            sum_cents = {key: 0 for key in COST_COMPONENTS + ("total",)}
+
+            def write_csv_rows(name, result):
+                monthly_writer.writerows(_monthly_rows(name, result))
+                totals_writer.writerow(_totals_row(name, result))
+                if exact_cents:
+                    for key in COST_COMPONENTS:
+                        sum_cents[key] += result["component_totals_cents"][key]
+                    sum_cents["total"] += result["total_lifetime_cost_cents"]
+            sinks.append(write_csv_rows)
+
+        if "json" in formats:
+            json_path = os.path.join(out_dir, "report.json")
+            json_file = open(json_path, "w", encoding="utf-8")
+            files.append(json_file)
+            paths.append(json_path)
+            json_file.write("[")
+            json_state = {"first": True}
+
+            def write_json_entry(name, result):
+                # Das Array wird Eintrag für Eintrag geschrieben statt am Ende komplett serialisiert.
+                json_file.write(("\n  " if json_state["first"] else ",\n  ")
+                                + json.dumps(_json_entry(name, result), ensure_ascii=False))
+                json_state["first"] = False
+            sinks.append(write_json_entry)
+
+        for name, result in iter_results(named_params, chunk_size, exact_cents):
+            for sink in sinks:
+                sink(name, result)
+
+        if "csv" in formats and exact_cents:
+            totals_writer.writerow(["SUMME"] + [cents_to_euros(sum_cents[key]) for key in COST_COMPONENTS + ("total",)])
+
+        if "json" in formats:
+            json_file.write("\n]\n")
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def safe_filename(name: str) -> str:
+    """Wandelt einen Konfigurationsnamen in einen gültigen Dateinamen um."""
+    cleaned = re.sub(r'[^\w\-. ]', '_', name).strip().replace(' ', '_')
+    return cleaned or "konfiguration"
+
+
+def _init_render_worker(figsize, dpi):
+    """Legt beim Start eines Arbeitsprozesses die einzige Figure dieses Prozesses an."""
+    global _worker_figure, _worker_ax
+    # Direkt über Figure + Agg-Canvas, ohne pyplot: kein GUI-Backend, keine globale Figurenverwaltung.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    _worker_figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(_worker_figure)
+    _worker_ax = _worker_figure.add_subplot(111)
+
+
+def _render_chunk(items: list, figsize=(7, 5), dpi: int = 100, exact_cents: bool = False) -> list:
+    """Berechnet und zeichnet einen Block von (Name, Parameter, PNG-Pfad) im Arbeitsprozess."""
+    from .chart import plot_monthly_costs
+    if _worker_figure is None:
+        _init_render_worker(figsize, dpi)
+
+    results = calculate_batch([params for _, params, _ in items], exact_cents)
+    written = []
+    for (name, _, png_path), result in zip(items, results):
+        _worker_ax.clear()
+        plot_monthly_costs(_worker_ax, result["monthly_data"], title=f"Monatliche Autokosten: {name}")
+        _worker_figure.tight_layout()
+        _worker_figure.savefig(png_path)
+        written.append(png_path)
+    return written
+
+
+def render_charts(named_params, out_dir: str, workers: int = None, chunk_size: int = 16,
+                  figsize=(7, 5), dpi: int = 100, exact_cents: bool = False) -> list:
+    """
+    Rendert die gestapelten Balkendiagramme aller Konfigurationen parallel als PNG.
+
+    Jeder Arbeitsprozess verwendet dieselbe Figure für alle seine Diagramme wieder.
+
+    Args:
+        named_params: Iterable von (Name, Parameter-Dict).
+        out_dir (str): Zielverzeichnis für die PNG-Dateien.
+        workers (int): Anzahl Prozesse (None = Anzahl CPUs).
+        chunk_size (int): Diagramme pro Auftrag an einen Arbeitsprozess.
+        figsize (tuple): Bildgröße in Zoll.
+        dpi (int): Auflösung.
+        exact_cents (bool): Im Cent-Modus rechnen, damit die Diagramme zu einem Export
+            mit exact_cents passen.
+
+    Returns:
+        list: Pfade der geschriebenen PNG-Dateien.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    items = []
+    used_filenames = set()
+    for name, params in named_params:
+        base = safe_filename(name)
+        filename, counter = base, 1
+        while filename in used_filenames:
+            counter += 1
+            filename = f"{base}_{counter}"
+        used_filenames.add(filename)
+        items.append((name, params, os.path.join(out_dir, filename + ".png")))
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    written = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(figsize, dpi)) as executor:
+        render = partial(_render_chunk, figsize=figsize, dpi=dpi, exact_cents=exact_cents)
+        for paths in executor.map(render, chunks):
+            written.extend(paths)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportiert Kostenberichte gespeicherter Konfigurationen.")
+    parser.add_argument("names", nargs="*", help="Namen der Konfigurationen (Standard: alle)")
+    parser.add_argument("--data-file", default=HISTORY_FILE_PATH,
+                        help="Konfigurationsspeicher: Versionsprotokoll (.jsonl, Standard) oder data.json")
+    parser.add_argument("--csv", dest="csv_file", help="Konfigurationen aus einer CSV-Datei statt aus der data.json lesen")
+    parser.add_argument("--out-dir", default="reports", help="Zielverzeichnis")
+    parser.add_argument("--format", dest="formats", action="append", choices=["csv", "json"],
+                        help="Exportformat (mehrfach angebbar, Standard: csv)")
+    parser.add_argument("--exact-cents", action="store_true",
+                        help="In ganzen Cent rechnen (exakte Summen für den Abgleich mit der Buchhaltung)")
+    parser.add_argument("--png", action="store_true", help="Zusätzlich Diagramme als PNG rendern")
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse für das PNG-Rendering")
+    args = parser.parse_args(argv)
+
+    if args.csv_file:
+        all_configs = {}
+        errors = []
+        first_lines = {}
+        with open(args.csv_file, "r", encoding="utf-8", newline="") as f:
+            try:
+                for line_number, name, result in read_parameters_csv(f):
+                    if name in first_lines:
+                        errors.append(f"Zeile {line_number} ({name}): Name bereits in Zeile {first_lines[name]} vergeben.")
+                        continue
+                    first_lines[name] = line_number
+                    if result.ok:
+                        all_configs[name] = result.values
+                    else:
+                        errors += [f"Zeile {line_number} ({name}): {message}" for message in result.errors.values()]
+            except ValueError as e:
+                parser.error(str(e))
+        if errors:
+            parser.error("Ungültige Werte in der CSV-Datei:\n" + "\n".join(errors))
+    else:
+        all_configs = open_config_store(args.data_file).load_all()
+    names = args.names or sorted(all_configs.keys())
+    missing = [n for n in names if n not in all_configs]
+    if missing:
+        parser.error(f"Unbekannte Konfiguration(en): {', '.join(missing)}")
+    named_params = [(name, all_configs[name]) for name in names]
+
+    for path in export_reports(named_params, args.out_dir, tuple(args.formats or ["csv"]),
+                               exact_cents=args.exact_cents):
+        print(f"Geschrieben: {path}")
+    if args.png:
+        charts = render_charts(named_params, os.path.join(args.out_dir, "charts"), workers=args.workers,
+                               exact_cents=args.exact_cents)
+        print(f"{len(charts)} Diagramme gerendert nach {os.path.join(args.out_dir, 'charts')}")
@@ -0,0 +1,362 @@
+# src/scenario_tree.py
+import math
+
+import numpy as np
+
+from .calculator import (CostCalculator, COST_COMPONENTS, cents_to_euros, loan_payment, to_cents,
+                         monthly_rows_from_cents, monthly_rows_from_components)
+from .insurance import Insurance
+from .parameters import validate_parameters
+
+# Parameter, deren Änderung in einem Zweig den laufenden Kredit ab dem Verzweigungsmonat umschuldet
+FINANCING_KEYS = ("car_purchase_price", "financing_interest_rate_percent",
+                  "financing_duration_years", "financing_balloon_payment")
+# Preise und Preissteigerung, die in einem Zweig ab dem Verzweigungsmonat neu gelten
+PRICE_KEYS = ("car_running_costs_monthly", "insurance_annual_cost",
+              "usage_fuel_price_per_liter", "general_operating_cost_increase_percent")
+
+# Intern geführte Arrays: Balkenwerte plus Finanzierung inkl. Schlussrate für die Summen
+_ARRAY_KEYS = COST_COMPONENTS + ("financing_actual",)
+# Für Gesamtsummen wird "financing_actual" statt des Balkenwerts verwendet
+_TOTAL_SOURCES = (("financing", "financing_actual"), ("operation", "operation"),
+                  ("insurance", "insurance"), ("fuel", "fuel"))
+
+
+class _Loan:
+    def __init__(self, principal: float, interest_rate_percent: float, term_months: int,
+                 balloon_payment: float, start_month: int):
+        """
+        Ein Annuitätenkredit, dessen erste Rate in start_month fällig wird.
+
+        Args:
+            principal (float): Finanzierter Betrag.
+            interest_rate_percent (float): Jährlicher Zinssatz in Prozent.
+            term_months (int): Laufzeit in Monaten.
+            balloon_payment (float): Schlussrate zusätzlich zur letzten Rate.
+            start_month (int): Monat der ersten Rate (1-basiert).
+        """
+        self.principal = principal
+        self.interest_rate_percent = interest_rate_percent
+        self.term_months = term_months
+        self.balloon_payment = balloon_payment
+        self.start_month = start_month
+        self.payment = loan_payment(principal, interest_rate_percent, term_months, balloon_payment)
+
+    @classmethod
+    def from_parameters(cls, params: dict) -> "_Loan":
+        """Der Kredit einer Basiskonfiguration: car_purchase_price ab Monat 1 finanziert."""
+        return cls(params["car_purchase_price"], params["financing_interest_rate_percent"],
+                   params["financing_duration_years"] * 12, params["financing_balloon_payment"], 1)
+
+    def remaining_months(self, month: int) -> int:
+        """Anzahl der Raten ab month (einschließlich) bis zum Ende der Laufzeit."""
+        return max(0, self.term_months - max(0, month - self.start_month))
+
+    def balance(self, month: int) -> float:
+        """
+        Restschuld zu Beginn von month, nach den Raten der Monate davor.
+
+        Enthält den noch nicht getilgten Anteil einschließlich der offenen Schlussrate;
+        nach der letzten Rate (samt Schlussrate) ist sie 0.
+        """
+        paid = month - self.start_month
+        if paid <= 0:
+            return self.principal
+        if paid >= self.term_months:
+            return 0.0
+        monthly_interest_rate = self.interest_rate_percent / 100.0 / 12.0
+        if monthly_interest_rate == 0:
+            return self.principal - self.payment * paid
+        growth = math.pow(1 + monthly_interest_rate, paid)
+        return self.principal * growth - self.payment * (growth - 1) / monthly_interest_rate
+
+    def monthly(self, first_month: int, last_month: int) -> tuple:
+        """Balkenwerte und tatsächliche Zahlungen (inkl. Schlussrate) der Monate first_month..last_month."""
+        payment_number = np.arange(first_month, last_month + 1) - self.start_month + 1
+        in_term = (payment_number >= 1) & (payment_number <= self.term_months)
+        bar = np.where(in_term, self.payment, 0.0)
+        balloon_due = (payment_number == self.term_months) & (self.balloon_payment > 0)
+        return bar, bar + np.where(balloon_due, self.balloon_payment, 0.0)
+
+
+class _PriceLevels:
+    def __init__(self, anchor_year: int, running_costs_monthly: float, insurance_monthly: float,
+                 fuel_price_per_liter: float, growth: float):
+        """
+        Preisniveau der inflationsabhängigen Posten: Wert im Jahr anchor_year mal growth je weiteres Jahr.
+
+        Args:
+            anchor_year (int): Jahresindex (0-basiert), in dem die Beträge unverändert gelten.
+            running_costs_monthly (float): Monatliche Betriebskosten im Jahr anchor_year.
+            insurance_monthly (float): Monatliche Versicherungskosten im Jahr anchor_year.
+            fuel_price_per_liter (float): Kraftstoffpreis im Jahr anchor_year.
+            growth (float): Jährlicher Steigerungsfaktor (1 + Preissteigerung / 100).
+        """
+        self.anchor_year = anchor_year
+        self.running_costs_monthly = running_costs_monthly
+        self.insurance_monthly = insurance_monthly
+        self.fuel_price_per_liter = fuel_price_per_liter
+        self.growth = growth
+
+    @classmethod
+    def from_parameters(cls, params: dict) -> "_PriceLevels":
+        """Die Preise einer Basiskonfiguration, gültig im ersten Jahr."""
+        return cls(0, params["car_running_costs_monthly"], Insurance(params["insurance_annual_cost"]).get_monthly_cost(),
+                   params["usage_fuel_price_per_liter"], 1 + (params["general_operating_cost_increase_percent"] / 100.0))
+
+    def inflation(self, year_index) -> np.ndarray:
+        return np.power(self.growth, year_index - self.anchor_year)
+
+    def rebased(self, anchor_year: int, params: dict, overrides: dict) -> "_PriceLevels":
+        """
+        Preise eines Zweigs ab anchor_year: übernimmt das bis dahin erreichte Preisniveau und
+        ersetzt die in overrides angegebenen Preise; die neue Preissteigerung wirkt ab dem Folgejahr.
+        """
+        factor = self.growth ** (anchor_year - self.anchor_year)
+        running = (params["car_running_costs_monthly"] if "car_running_costs_monthly" in overrides
+                   else self.running_costs_monthly * factor)
+        insurance = (Insurance(params["insurance_annual_cost"]).get_monthly_cost() if "insurance_annual_cost" in overrides
+                     else self.insurance_monthly * factor)
+        fuel = (params["usage_fuel_price_per_liter"] if "usage_fuel_price_per_liter" in overrides
+                else self.fuel_price_per_liter * factor)
+        growth = 1 + (params["general_operating_cost_increase_percent"] / 100.0)
+        return _PriceLevels(anchor_year, running, insurance, fuel, growth)
+
+
+class ScenarioNode:
+    def __init__(self, tree, parent, name: str, params: dict, first_month: int, loan: _Loan, prices: _PriceLevels):
+        """
+        Ein Szenario im Baum: übernimmt die Monate vor first_month von seinem Elternknoten
+        und berechnet selbst nur die Monate ab first_month.
+
+        Knoten werden über ScenarioTree bzw. ScenarioNode.branch angelegt, nicht direkt.
+
+        Args:
+            tree (ScenarioTree): Zugehöriger Baum.
+            parent (ScenarioNode): Elternknoten oder None für die Wurzel.
+            name (str): Bezeichnung des Szenarios.
+            params (dict): Vollständige, validierte Parameter dieses Szenarios.
+            first_month (int): Erster selbst berechneter Monat (1-basiert).
+            loan (_Loan): Der ab first_month laufende Kredit.
+            prices (_PriceLevels): Die ab first_month geltenden Preise.
+        """
+        self.tree = tree
+        self.parent = parent
+        self.name = name
+        self.params = params
+        self.first_month = first_month
+        self.loan = loan
+        self.prices = prices
+        self.total_months = params["usage_car_lifetime_years"] * 12
+        self.children = []
+
+        self._own = self._compute_own_months()
+        # Summen der Monate vor first_month, vom Elternknoten übernommen statt neu addiert
+        self._prefix = parent.cumulative_totals(first_month - 1) if parent is not None else self.tree._zero_totals()
+        self._cumulative = {key: np.cumsum(self._own[source]) for key, source in _TOTAL_SOURCES}
+
+    def _compute_own_months(self) -> dict:
+        last_month = self.total_months
+        if last_month < self.first_month:
+            dtype = np.int64 if self.tree.exact_cents else float
+            return {key: np.zeros(0, dtype=dtype) for key in _ARRAY_KEYS}
+
+        # Gleiche Rechenreihenfolge wie calculator._monthly_component_matrix, damit die Wurzel
+        # bitgenau CostCalculator.get_cost_breakdown_for_chart entspricht.
+        calculator = CostCalculator.from_parameters(self.params)
+        inflation = self.prices.inflation((np.arange(self.first_month, last_month + 1) - 1) // 12)
+        fuel_per_month = ((calculator.km_per_month / 100.0) * calculator.car.consumption_per_100km
+                          if calculator.car.consumption_per_100km > 0 and calculator.km_per_month > 0 else 0.0)
+        financing, financing_actual = self.loan.monthly(self.first_month, last_month)
+        components = {
+            "financing": financing,
+            "financing_actual": financing_actual,
+            "operation": self.prices.running_costs_monthly * inflation,
+            "insurance": self.prices.insurance_monthly * inflation,
+            "fuel": fuel_per_month * (self.prices.fuel_price_per_liter * inflation),
+        }
+
+        if self.tree.exact_cents:
+            return {key: to_cents(values) for key, values in components.items()}
+        return components
+
+    # --- Verzweigen ---
+
+    def branch(self, name: str, month: int, overrides: dict) -> "ScenarioNode":
+        """
+        Legt ein Unterszenario an, das ab month die geänderten Parameter verwendet.
+
+        Die Monate davor werden unverändert übernommen; berechnet werden nur die Monate
+        ab month.
+
+        Preise (Betriebskosten, Versicherung, Kraftstoffpreis) in overrides gelten ab month
+        so wie angegeben, nicht als Preise des ersten Jahres. Nicht geänderte Preise behalten
+        das bis month erreichte Niveau; eine geänderte Preissteigerung wirkt ab dem nächsten Jahr.
+
+        Ändert overrides die Finanzierung, wird ab month umgeschuldet: Der neue Kredit
+        finanziert die Restschuld des laufenden Kredits (einschließlich offener Schlussrate)
+        zum neuen Zinssatz über die Restlaufzeit. Eine angegebene financing_duration_years gilt
+        als neue Laufzeit ab month, financing_balloon_payment als Schlussrate des neuen Kredits.
+        Ein angegebener car_purchase_price ersetzt die Restschuld als neu finanzierter Betrag
+        (z.B. für eine Anschlussfinanzierung oder ein neues Fahrzeug).
+
+        Args:
+            name (str): Bezeichnung des Unterszenarios.
+            month (int): Erster Monat mit den neuen Parametern (z.B. 37 für "ab Jahr 4").
+            overrides (dict): Geänderte Parameter im Format der data.json.
+
+        Raises:
+            ValueError: Bei ungültigen Parametern oder einem Monat außerhalb des übernehmbaren Bereichs.
+        """
+        result = validate_parameters({**self.params, **overrides})
+        if not result.ok:
+            raise ValueError(result.error_message())
+        params = result.values
+
+        if month < self.first_month:
+            raise ValueError(f"Ein Zweig von '{self.name}' kann frühestens in Monat {self.first_month} beginnen.")
+        if month - 1 > self.total_months:
+            raise ValueError(f"'{self.name}' endet nach Monat {self.total_months}; "
+                             f"ein Zweig kann spätestens in Monat {self.total_months + 1} beginnen.")
+        if month > params["usage_car_lifetime_years"] * 12:
+            raise ValueError(f"Die Haltedauer von '{name}' endet vor Monat {month}; "
+                             f"der Zweig hätte keinen eigenen Monat.")
+
+        refinanced = any(key in overrides and params[key] != self.params[key] for key in FINANCING_KEYS)
+        repriced = any(key in overrides and params[key] != self.params[key] for key in PRICE_KEYS)
+        loan = self._refinanced_loan(month, params, overrides) if refinanced else self.loan
+        prices = self.prices.rebased((month - 1) // 12, params, overrides) if repriced else self.prices
+        child = ScenarioNode(self.tree, self, name, params, month, loan, prices)
+        self.children.append(child)
+        return child
+
+    def _refinanced_loan(self, month: int, params: dict, overrides: dict) -> _Loan:
+        remaining_months = self.loan.remaining_months(month)
+        if remaining_months == 0 and "car_purchase_price" not in overrides:
+            # Der laufende Kredit ist abbezahlt: ohne neu finanzierten Betrag gibt es nichts umzuschulden.
+            return _Loan(0.0, params["financing_interest_rate_percent"], 0, 0.0, month)
+        if "car_purchase_price" in overrides:
+            principal = params["car_purchase_price"]
+        else:
+            principal = self.loan.balance(month)
+        if "financing_duration_years" in overrides or remaining_months == 0:
+            term_months = params["financing_duration_years"] * 12
+        else:
+            term_months = remaining_months
+        return _Loan(principal, params["financing_interest_rate_percent"], term_months,
+                     params["financing_balloon_payment"], month)
+
+    # --- Ergebnisse ---
+
+    def cumulative_totals(self, month: int) -> dict:
+        """
+        Summen je Komponente über die Monate 1..month dieses Szenarios.
+
+        Kostet nur einen Blick in die kumulierten Arrays (und ggf. den Weg zu Vorfahren),
+        nie eine neue Summation über alle Monate.
+        """
+        month = min(month, self.total_months)
+        if month <= 0:
+            return self.tree._zero_totals()
+        if month < self.first_month - 1:
+            return self.parent.cumulative_totals(month)
+        if month == self.first_month - 1:
+            return dict(self._prefix)
+        index = month - self.first_month
+        return {key: self._prefix[key] + self._cumulative[key][index] for key, _ in _TOTAL_SOURCES}
+
+    def totals(self) -> dict:
+        """Gesamtkosten und component_totals über die ganze Haltedauer dieses Szenarios."""
+        sums = self.cumulative_totals(self.total_months)
+        if self.tree.exact_cents:
+            component_totals_cents = {key: int(value) for key, value in sums.items()}
+            total_cents = sum(component_totals_cents.values())
+            return {
+                "total_lifetime_cost": cents_to_euros(total_cents),
+                "component_totals": {key: cents_to_euros(value) for key, value in component_totals_cents.items()},
+                "total_lifetime_cost_cents": total_cents,
+                "component_totals_cents": component_totals_cents
+            }
+        return {
+            "total_lifetime_cost": round(float(sum(sums.values())), 2),
+            "component_totals": {key: round(float(value), 2) for key, value in sums.items()}
+        }
+
+    def monthly_components(self) -> dict:
+        """Die vollständigen Monats-Arrays (geerbter Anfang + eigene Monate) dieses Szenarios."""
+        segments = []
+        node, end = self, self.total_months
+        while node is not None and end >= 1:
+            start = node.first_month
+            own_count = max(0, min(end, node.total_months) - start + 1)
+            segments.append({key: values[:own_count] for key, values in node._own.items()})
+            end = min(end, start - 1)
+            node = node.parent
+        segments.reverse()
+        return {key: np.concatenate([segment[key] for segment in segments]) for key in _ARRAY_KEYS}
+
+    def get_cost_breakdown(self) -> dict:
+        """Ergebnis im Format von CostCalculator.get_cost_breakdown_for_chart."""
+        components = self.monthly_components()
+        if self.tree.exact_cents:
+            monthly_data = monthly_rows_from_cents(components)
+        else:
+            monthly_data = monthly_rows_from_components(components)
+        return {"monthly_data": monthly_data, **self.totals()}
+
+    def path(self) -> list:
+        """Namen von der Wurzel bis zu diesem Szenario."""
+        names = []
+        node = self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return names[::-1]
+
+    def walk(self):
+        """Durchläuft dieses Szenario und alle Unterszenarien (Tiefensuche)."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def __str__(self):
+        return f"Szenario({' > '.join(self.path())}, ab Monat {self.first_month})"
+
+
+class ScenarioTree:
+    def __init__(self, params: dict, name: str = "Basis", exact_cents: bool = False):
+        """
+        Baum von Was-wäre-wenn-Szenarien über einer Basiskonfiguration.
+
+        Zweige teilen sich die bereits berechneten Monate ihres Elternszenarios und
+        berechnen nur die Monate ab dem Verzweigungsmonat neu; Gesamtsummen werden aus
+        kumulierten Summen fortgeschrieben.
+
+        Beispiel:
+            tree = ScenarioTree(params)
+            teurer = tree.root.branch("Kraftstoff 2,10 €", 37, {"usage_fuel_price_per_liter": 2.10})
+            teurer.totals()
+
+        Args:
+            params (dict): Basisparameter im Format der data.json.
+            name (str): Bezeichnung des Basisszenarios.
+            exact_cents (bool): Ganzzahliger Cent-Modus (siehe calculator.to_cents).
+
+        Raises:
+            ValueError: Bei ungültigen Basisparametern.
+        """
+        result = validate_parameters(params)
+        if not result.ok:
+            raise ValueError(result.error_message())
+        self.exact_cents = exact_cents
+        params = result.values
+        self.root = ScenarioNode(self, None, name, params, first_month=1,
+                                 loan=_Loan.from_parameters(params), prices=_PriceLevels.from_parameters(params))
+
+    def _zero_totals(self) -> dict:
+        zero = 0 if self.exact_cents else 0.0
+        return {key: zero for key, _ in _TOTAL_SOURCES}
+
+    def find(self, name: str):
+        """Sucht ein Szenario nach Namen; gibt None zurück, wenn es keins gibt."""
+        return next((node for node in self.root.walk() if node.name == name), None)
@@ -0,0 +1,489 @@
+# src/service.py
+import argparse
+import asyncio
+import ipaddress
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from urllib.parse import unquote
+
+from .calculator import calculate_batch
+from .config_store import ConfigStore, VersionedConfigStore, HISTORY_FILE_PATH, open_config_store
+from .parameters import validate_parameters
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+HTTP_REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, details=None):
+        """
+        Fehler, der direkt als JSON-Antwort mit dem angegebenen Statuscode ausgeliefert wird.
+
+        Args:
+            status (int): HTTP-Statuscode.
+            message (str): Fehlermeldung für den Aufrufer.
+            details: Optionale Zusatzinformationen (z.B. Fehler je Parameter).
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+class ServiceMetrics:
+    def __init__(self, latency_window: int = 2000):
+        """
+        Sammelt Latenz- und Durchsatzkennzahlen des Service.
+
+        Args:
+            latency_window (int): Anzahl der zuletzt gemessenen Latenzen für die Perzentile.
+        """
+        self.started_at = time.monotonic()
+        self.requests_total = 0
+        self.errors_total = 0
+        self.requests_by_route = {}
+        self.latencies_ms = deque(maxlen=latency_window)
+        self.batches_total = 0
+        self.batched_items_total = 0
+        self.max_batch_size = 0
+
+    def record_request(self, route: str, status: int, latency_s: float):
+        self.requests_total += 1
+        if status >= 400:
+            self.errors_total += 1
+        self.requests_by_route[route] = self.requests_by_route.get(route, 0) + 1
+        self.latencies_ms.append(latency_s * 1000.0)
+
+    def record_batch(self, size: int):
+        self.batches_total += 1
+        self.batched_items_total += size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started_at
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p / 100.0 * (len(latencies) - 1))))
+            return round(latencies[index], 3)
+
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "requests_per_second": round(self.requests_total / uptime, 3) if uptime > 0 else 0.0,
+            "requests_by_route": dict(self.requests_by_route),
+            "latency_ms": {
+                "p50": percentile(50),
+                "p95": percentile(95),
+                "p99": percentile(99),
+                "max": round(latencies[-1], 3) if latencies else 0.0,
+                "samples": len(latencies),
+            },
+            "batching": {
+                "batches_total": self.batches_total,
+                "items_total": self.batched_items_total,
+                "avg_batch_size": round(self.batched_items_total / self.batches_total, 3) if self.batches_total else 0.0,
+                "max_batch_size": self.max_batch_size,
+            },
+        }
+
+
+class CalculationBatcher:
+    def __init__(self, executor, metrics: ServiceMetrics, max_batch_size: int = 64, max_delay_ms: float = 2.0):
+        """
+        Fasst gleichzeitig eintreffende Einzelberechnungen zu einer vektorisierten Auswertung zusammen.
+
+        calculate_batch rechnet Konfigurationen je Haltedauer getrennt; eine Anfrage mit langer
+        Haltedauer verlängert daher nicht die Berechnung der übrigen Anfragen im selben Batch.
+
+        Args:
+            executor: Executor, in dem calculate_batch ausgeführt wird.
+            metrics (ServiceMetrics): Zielobjekt für Batch-Kennzahlen.
+            max_batch_size (int): Maximale Anzahl Konfigurationen pro Auswertung.
+            max_delay_ms (float): Maximale Wartezeit auf weitere Anfragen, bevor ausgewertet wird.
+        """
+        self.executor = executor
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_delay_s = max_delay_ms / 1000.0
+        self._pending = []
+        self._flush_handle = None
+
+    def submit(self, params: dict) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((params, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay_s, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: list):
+        self.metrics.record_batch(len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, calculate_batch, [params for params, _ in batch])
+        except Exception as e:
+            # Ein fehlerhafter Eintrag soll nicht den ganzen Batch scheitern lassen:
+            # dann jede Konfiguration einzeln auswerten.
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            for item in batch:
+                await self._run_batch([item])
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class CalculationService:
+    def __init__(self,
+                 store: ConfigStore,
+                 executor,
+                 max_batch_size: int = 64,
+                 max_delay_ms: float = 2.0,
+                 batch_chunk_size: int = 256,
+                 max_body_bytes: int = 16 * 1024 * 1024):
+        """
+        Lokaler HTTP/JSON-Service für CostCalculator und den Konfigurationsspeicher.
+
+        Endpunkte:
+            GET    /health                   Lebenszeichen
+            GET    /metrics                  Latenz-, Durchsatz- und Batch-Kennzahlen
+            POST   /calculate                Eine Konfiguration berechnen (wird mit parallelen Anfragen gebündelt)
+            POST   /calculate/batch          Liste von Konfigurationen berechnen (verteilt auf den Prozesspool;
+                                             {"configurations": [...], "exact_cents": true} rechnet in ganzen Cent)
+            GET    /configs                  Namen aller gespeicherten Konfigurationen
+            GET    /configs/<name>           Gespeicherte Parameter
+            PUT    /configs/<name>           Parameter speichern/überschreiben
+            DELETE /configs/<name>           Konfiguration löschen
+            POST   /configs/<name>/calculate Gespeicherte Konfiguration berechnen
+            GET    /configs/<name>/history   Versionsgeschichte (nur mit VersionedConfigStore)
+            GET    /configs/<name>/versions/<n> Parameter einer älteren Version
+
+        Args:
+            store (ConfigStore): Speicher der benannten Konfigurationen.
+            executor: Prozesspool (oder anderer Executor) für die Berechnungen.
+            max_batch_size (int): Maximale Größe eines zusammengefassten Einzelanfragen-Batches.
+            max_delay_ms (float): Wartezeit zum Sammeln paralleler Einzelanfragen.
+            batch_chunk_size (int): Konfigurationen pro Prozesspool-Auftrag bei /calculate/batch.
+            max_body_bytes (int): Maximale Größe eines Request-Bodys.
+        """
+        self.store = store
+        self.executor = executor
+        self.metrics = ServiceMetrics()
+        self.batcher = CalculationBatcher(executor, self.metrics, max_batch_size, max_delay_ms)
+        self.batch_chunk_size = batch_chunk_size
+        self.max_body_bytes = max_body_bytes
+        self._store_lock = asyncio.Lock()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                # Bis der Body vollständig gelesen ist, stünden dessen Bytes noch vor der nächsten
+                # Anfragezeile; bei Fehlern davor (400, 413) wird die Verbindung daher geschlossen.
+                keep_alive = False
+                route = "invalid"
+                try:
+                    method, path, version = self._parse_request_line(request_line)
+                    headers = await self._read_headers(reader)
+                    body = await self._read_body(reader, headers)
+                    keep_alive = self._wants_keep_alive(version, headers)
+                    route, handler, args = self._resolve(method, path)
+                    status, payload = await handler(body, *args)
+                    response_body = self._encode_payload(payload)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                    if e.details is not None:
+                        payload["details"] = e.details
+                    response_body = self._encode_payload(payload)
+                except Exception as e:
+                    status, response_body = 500, self._encode_payload({"error": str(e)})
+                self._write_response(writer, status, response_body, keep_alive)
+                await writer.drain()
+                self.metrics.record_request(route, status, time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # --- HTTP-Grundgerüst ---
+
+    def _parse_request_line(self, line: bytes):
+        parts = line.decode("latin-1").strip().split()
+        if len(parts) != 3:
+            raise HTTPError(400, "Ungültige Anfragezeile.")
+        method, target, version = parts
+        return method.upper(), target.split("?", 1)[0], version.upper()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> dict:
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict) -> bytes:
+        if "transfer-encoding" in headers:
+            # Chunked-Bodys werden nicht gelesen; ihre Bytes dürfen nicht als nächste Anfrage gelten.
+            raise HTTPError(411, "Transfer-Encoding wird nicht unterstützt; bitte Content-Length angeben.")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Ungültiger Content-Length-Header.")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"Request-Body größer als {self.max_body_bytes} Bytes.")
+        return await reader.readexactly(length) if length > 0 else b""
+
+    def _wants_keep_alive(self, version: str, headers: dict) -> bool:
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def _encode_payload(self, payload) -> bytes:
+        try:
+            # allow_nan=False: json.dumps schriebe sonst Infinity/NaN, was kein gültiges JSON ist.
+            return json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        except ValueError:
+            raise HTTPError(400, "Die Berechnung ergibt nicht endliche Beträge "
+                                 "(z.B. durch einen zu hohen Zinssatz oder eine zu lange Finanzierungsdauer).")
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool):
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Error')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    def _resolve(self, method: str, path: str):
+        segments = [unquote(s) for s in path.strip("/").split("/") if s]
+        routes = {
+            ("GET", ("health",)): self._handle_health,
+            ("GET", ("metrics",)): self._handle_metrics,
+            ("POST", ("calculate",)): self._handle_calculate,
+            ("POST", ("calculate", "batch")): self._handle_calculate_batch,
+            ("GET", ("configs",)): self._handle_list_configs,
+        }
+        handler = routes.get((method, tuple(segments)))
+        if handler is not None:
+            return "/" + "/".join(segments), handler, ()
+
+        if len(segments) >= 2 and segments[0] == "configs":
+            name = segments[1]
+            config_routes = {
+                ("GET", 2): ("/configs/<name>", self._handle_get_config),
+                ("PUT", 2): ("/configs/<name>", self._handle_put_config),
+                ("DELETE", 2): ("/configs/<name>", self._handle_delete_config),
+            }
+            if len(segments) == 3 and segments[2] == "calculate" and method == "POST":
+                return "/configs/<name>/calculate", self._handle_calculate_config, (name,)
+            if len(segments) == 3 and segments[2] == "history" and method == "GET":
+                return "/configs/<name>/history", self._handle_config_history, (name,)
+            if len(segments) == 4 and segments[2] == "versions" and method == "GET":
+                return "/configs/<name>/versions/<n>", self._handle_config_version, (name, segments[3])
+            if (method, len(segments)) in config_routes:
+                route, handler = config_routes[(method, len(segments))]
+                return route, handler, (name,)
+            if len(segments) == 2:
+                raise HTTPError(405, f"Methode {method} für /configs/<name> nicht erlaubt.")
+
+        raise HTTPError(404, f"Unbekannter Pfad: {path}")
+
+    def _parse_json(self, body: bytes):
+        if not body:
+            raise HTTPError(400, "Request-Body fehlt.")
+        try:
+            return json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"Ungültiges JSON: {e}")
+
+    # --- Endpunkte ---
+
+    async def _handle_health(self, body):
+        return 200, {"status": "ok"}
+
+    async def _handle_metrics(self, body):
+        return 200, self.metrics.snapshot()
+
+    def _validated(self, params) -> dict:
+        if not isinstance(params, dict):
+            raise HTTPError(400, "Erwartet wird ein JSON-Objekt mit Parametern.")
+        result = validate_parameters(params)
+        if not result.ok:
+            raise HTTPError(400, "Ungültige Parameter.", result.errors)
+        return result.values
+
+    async def _calculate_one(self, params):
+        return await self.batcher.submit(self._validated(params))
+
+    async def _handle_calculate(self, body):
+        return 200, await self._calculate_one(self._parse_json(body))
+
+    async def _handle_calculate_batch(self, body):
+        data = self._parse_json(body)
+        parameter_sets = data.get("configurations") if isinstance(data, dict) else data
+        exact_cents = data.get("exact_cents", False) if isinstance(data, dict) else False
+        if not isinstance(exact_cents, bool):
+            raise HTTPError(400, "\"exact_cents\" muss true oder false sein.")
+        if not isinstance(parameter_sets, list) or not all(isinstance(p, dict) for p in parameter_sets):
+            raise HTTPError(400, "Erwartet wird eine Liste von Parameter-Objekten (oder {\"configurations\": [...]}).")
+        results = [validate_parameters(p) for p in parameter_sets]
+        errors = {str(index): r.errors for index, r in enumerate(results) if not r.ok}
+        if errors:
+            raise HTTPError(400, "Ungültige Parameter.", errors)
+        parameter_sets = [r.values for r in results]
+
+        loop = asyncio.get_running_loop()
+        chunks = [parameter_sets[i:i + self.batch_chunk_size]
+                  for i in range(0, len(parameter_sets), self.batch_chunk_size)]
+        try:
+            chunk_results = await asyncio.gather(
+                *(loop.run_in_executor(self.executor, partial(calculate_batch, exact_cents=exact_cents), chunk)
+                  for chunk in chunks))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        for chunk in chunks:
+            self.metrics.record_batch(len(chunk))
+        return 200, {"results": [result for chunk in chunk_results for result in chunk]}
+
+    async def _handle_list_configs(self, body):
+        async with self._store_lock:
+            return 200, {"configs": self.store.names()}
+
+    async def _handle_get_config(self, body, name):
+        async with self._store_lock:
+            params = self.store.get(name)
+        if params is None:
+            raise HTTPError(404, f"Konfiguration '{name}' nicht gefunden.")
+        return 200, {"name": name, "parameters": params}
+
+    async def _handle_put_config(self, body, name):
+        params = self._validated(self._parse_json(body))
+        async with self._store_lock:
+            existed = self.store.get(name) is not None
+            self.store.save(name, params)
+        return (200 if existed else 201), {"name": name, "parameters": params}
+
+    async def _handle_delete_config(self, body, name):
+        async with self._store_lock:
+            deleted = self.store.delete(name)
+        if not deleted:
+            raise HTTPError(404, f"Konfiguration '{name}' nicht gefunden.")
+        return 200, {"deleted": name}
+
+    async def _handle_calculate_config(self, body, name):
+        async with self._store_lock:
+            params = self.store.get(name)
+        if params is None:
+            raise HTTPError(404, f"Konfiguration '{name}' nicht gefunden.")
+        return 200, await self._calculate_one(params)
+
+    def _versioned_store(self) -> VersionedConfigStore:
+        if not isinstance(self.store, VersionedConfigStore):
+            raise HTTPError(404, "Der verwendete Speicher führt keine Versionsgeschichte.")
+        return self.store
+
+    async def _handle_config_history(self, body, name):
+        store = self._versioned_store()
+        async with self._store_lock:
+            history = store.history(name)
+        if not history:
+            raise HTTPError(404, f"Konfiguration '{name}' nicht gefunden.")
+        return 200, {"name": name, "versions": history}
+
+    async def _handle_config_version(self, body, name, version):
+        store = self._versioned_store()
+        try:
+            version_number = int(version)
+        except ValueError:
+            raise HTTPError(400, f"Ungültige Versionsnummer: '{version}'.")
+        async with self._store_lock:
+            params = store.get_version(name, version_number)
+        if params is None:
+            raise HTTPError(404, f"Version {version_number} von '{name}' nicht gefunden.")
+        return 200, {"name": name, "version": version_number, "parameters": params}
+
+
+def _ensure_loopback(host: str):
+    """Der Service ist nur für den lokalen Betrieb gedacht und lehnt andere Adressen ab."""
+    if host == "localhost":
+        return
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+    raise ValueError(f"Der Service darf nur an eine Loopback-Adresse gebunden werden, nicht an '{host}'.")
+
+
+async def serve(host: str = DEFAULT_HOST,
+                port: int = DEFAULT_PORT,
+                data_file: str = HISTORY_FILE_PATH,
+                workers: int = None,
+                max_batch_size: int = 64,
+                max_delay_ms: float = 2.0):
+    """Startet den Service und läuft, bis die Task abgebrochen wird."""
+    _ensure_loopback(host)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        service = CalculationService(open_config_store(data_file), executor,
+                                     max_batch_size=max_batch_size, max_delay_ms=max_delay_ms)
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(f"Autokosten-Service läuft auf http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler HTTP/JSON-Service für den Autokostenrechner.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Loopback-Adresse (Standard: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-file", default=HISTORY_FILE_PATH,
+                        help="Konfigurationsspeicher: Versionsprotokoll (.jsonl, Standard) oder data.json")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl der Prozesse im Berechnungspool")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_file, args.workers,
+                          args.max_batch_size, args.max_delay_ms))
+    except KeyboardInterrupt:
+        print("Service beendet.")
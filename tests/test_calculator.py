@@ -0,0 +1,97 @@
+# tests/test_calculator.py
+import math
+
+import numpy as np
+import pytest
+
+from src.calculator import (CostCalculator, COST_COMPONENTS, calculate_batch, calculate_totals_cents,
+                            sum_totals_cents, to_cents)
+
+
+def _fleet():
+    """Konfigurationen mit unterschiedlichen Haltedauern, Finanzierungen und Schlussraten."""
+    fleet = []
+    for i in range(40):
+        fleet.append({
+            "car_purchase_price": 18000.0 + 937.13 * i,
+            "car_running_costs_monthly": 45.5 + i,
+            "car_consumption_per_100km": 4.5 + (i % 7) * 0.61,
+            "financing_interest_rate_percent": (i % 5) * 1.37,
+            "financing_duration_years": i % 6,
+            "financing_balloon_payment": 2500.0 if i % 4 == 0 else 0.0,
+            "insurance_annual_cost": 1009.38 + 11.1 * i,
+            "usage_km_per_year": 9000.0 + 731.0 * i,
+            "usage_fuel_price_per_liter": 1.659 + (i % 3) * 0.1,
+            "usage_car_lifetime_years": 1 + i % 12,
+            "general_operating_cost_increase_percent": (i % 4) * 1.5,
+        })
+    return fleet
+
+
+@pytest.mark.parametrize("euros, cents", [
+    (0.005, 1),
+    (0.015, 2),
+    (0.125, 13),
+    (2.675, 268),
+    (12.345, 1235),
+    (-0.125, -13),
+    (-0.625, -63),
+    (0.0, 0),
+])
+def test_to_cents_rounds_half_cents_away_from_zero(euros, cents):
+    assert to_cents(euros) == cents
+
+
+def test_to_cents_rounds_below_half_down():
+    # 1.005 liegt als Binärzahl knapp unter 1,005 (100.49999999999999 Cent)
+    assert to_cents(1.005) == 100
+    assert to_cents([84.114999, 84.115001]).tolist() == [8411, 8412]
+
+
+@pytest.mark.parametrize("value", [math.inf, -math.inf, math.nan, 1e17])
+def test_to_cents_rejects_unrepresentable_values(value):
+    with pytest.raises(ValueError):
+        to_cents(value)
+
+
+def test_totals_cents_match_batch_in_cent_mode():
+    fleet = _fleet()
+    results = calculate_batch(fleet, exact_cents=True)
+    # Kleine Blöcke, damit mehrere Blöcke und Haltedauer-Gruppen durchlaufen werden
+    totals = calculate_totals_cents(fleet, chunk_size=7)
+
+    for key in COST_COMPONENTS:
+        assert totals[key].tolist() == [r["component_totals_cents"][key] for r in results]
+    assert totals["total"].tolist() == [r["total_lifetime_cost_cents"] for r in results]
+    assert int(totals["total"].sum()) == sum_totals_cents(results)["total"]
+
+
+def test_totals_cents_of_empty_fleet():
+    totals = calculate_totals_cents([])
+    assert all(len(values) == 0 for values in totals.values())
+
+
+def test_cent_mode_sums_are_exact_sums_of_monthly_values():
+    for params, result in zip(_fleet(), calculate_batch(_fleet(), exact_cents=True)):
+        monthly = result["monthly_data"]
+        assert len(monthly) == params["usage_car_lifetime_years"] * 12
+        for item in monthly:
+            assert to_cents(item["total"]) == sum(to_cents(item[key]) for key in COST_COMPONENTS)
+        for key in ("operation", "insurance", "fuel"):
+            assert result["component_totals_cents"][key] == sum(to_cents(item[key]) for item in monthly)
+        assert result["total_lifetime_cost_cents"] == sum(result["component_totals_cents"].values())
+
+
+def test_batch_in_cent_mode_matches_single_calculator():
+    fleet = _fleet()
+    for params, result in zip(fleet, calculate_batch(fleet, exact_cents=True)):
+        calculator = CostCalculator.from_parameters(params)
+        expected = calculator.get_cost_breakdown_for_chart(params["usage_car_lifetime_years"] * 12, exact_cents=True)
+        assert result == expected
+
+
+def test_cent_mode_stays_within_a_cent_per_month_of_float_mode():
+    fleet = _fleet()
+    for params, exact, approx in zip(fleet, calculate_batch(fleet, exact_cents=True), calculate_batch(fleet)):
+        months = params["usage_car_lifetime_years"] * 12
+        assert np.isclose(exact["total_lifetime_cost"], approx["total_lifetime_cost"], atol=0.005 * 4 * months + 0.01)
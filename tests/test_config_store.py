@@ -0,0 +1,121 @@
+# tests/test_config_store.py
+import json
+import random
+
+from src.config_store import ConfigStore, VersionedConfigStore, open_config_store
+
+
+def _open(path, **kwargs):
+    return VersionedConfigStore(str(path), legacy_filepath=None, **kwargs)
+
+
+def _record_history(store, name, steps, seed=1):
+    """Speichert zufällige Änderungen und gibt {Version: Parameter oder None} zurück."""
+    rng = random.Random(seed)
+    expected = {}
+    params = {"car_purchase_price": 30000.0, "usage_car_lifetime_years": 10}
+    for step in range(steps):
+        if step % 9 == 8:
+            store.delete(name)
+            expected[len(expected) + 1] = None
+            continue
+        params = dict(params)
+        params[rng.choice(["car_purchase_price", "insurance_annual_cost", "usage_km_per_year"])] = rng.randint(1, 99999)
+        if rng.random() < 0.2 and "insurance_annual_cost" in params:
+            del params["insurance_annual_cost"]
+        version = store.save(name, params)
+        expected[version] = dict(params)
+    return expected
+
+
+def test_get_version_across_snapshot_boundaries(tmp_path):
+    path = tmp_path / "history.jsonl"
+    expected = _record_history(_open(path, snapshot_interval=4), "golf", 60)
+
+    ops = [json.loads(line)["op"] for line in path.read_text(encoding="utf-8").splitlines()]
+    assert {"snapshot", "diff", "delete"} <= set(ops)
+
+    # Frisch geöffnet und mit minimalem Cache: jede Version muss aus der Datei rekonstruiert werden
+    reader = _open(path, snapshot_interval=4, cache_size=1)
+    for version in random.Random(2).sample(sorted(expected), len(expected)):
+        assert reader.get_version("golf", version) == expected[version]
+    assert reader.get_version("golf", 0) is None
+    assert reader.get_version("golf", len(expected) + 1) is None
+
+
+def test_delete_and_save_again(tmp_path):
+    store = _open(tmp_path / "history.jsonl")
+    store.save("golf", {"car_purchase_price": 1.0})
+    assert store.delete("golf")
+    assert not store.delete("golf")
+    assert store.get("golf") is None
+    assert store.names() == []
+
+    assert store.save("golf", {"car_purchase_price": 2.0}) == 3
+    assert store.get_version("golf", 1) == {"car_purchase_price": 1.0}
+    assert store.get_version("golf", 2) is None
+    assert [entry["op"] for entry in store.history("golf")] == ["snapshot", "delete", "snapshot"]
+
+
+def test_unchanged_save_adds_no_version(tmp_path):
+    path = tmp_path / "history.jsonl"
+    store = _open(path)
+    assert store.save("golf", {"car_purchase_price": 1.0}) == 1
+    assert store.save("golf", {"car_purchase_price": 1.0}) == 1
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_truncated_trailing_line_is_ignored(tmp_path):
+    path = tmp_path / "history.jsonl"
+    expected = _record_history(_open(path, snapshot_interval=4), "golf", 20)
+    with open(path, "ab") as f:
+        f.write(b'{"op":"diff","name":"golf","version":')
+
+    store = _open(path, snapshot_interval=4)
+    last_version = max(expected)
+    assert store.history("golf")[-1]["version"] == last_version
+    assert store.get("golf") == expected[last_version]
+
+    # Die nächste Speicherung schließt die kaputte Zeile ab und bleibt lesbar.
+    assert store.save("golf", {"car_purchase_price": 5.0}) == last_version + 1
+    reader = _open(path, snapshot_interval=4, cache_size=1)
+    assert reader.get("golf") == {"car_purchase_price": 5.0}
+    for version, params in expected.items():
+        assert reader.get_version("golf", version) == params
+
+
+def test_two_writers_do_not_lose_versions(tmp_path):
+    path = tmp_path / "history.jsonl"
+    gui, service = _open(path), _open(path)
+    gui.save("golf", {"k0": 1, "k1": 1, "k2": 1})
+    assert service.get("golf") == {"k0": 1, "k1": 1, "k2": 1}
+
+    assert gui.save("golf", {"k0": 1, "k1": 200, "k2": 1}) == 2
+    # Der zweite Schreiber sieht die Version des ersten und vergibt die nächste Nummer.
+    assert service.save("golf", {"k0": 100, "k1": 200, "k2": 300}) == 3
+    assert gui.save("golf", {"k0": 100, "k1": 200, "k2": 4}) == 4
+
+    reader = _open(path)
+    assert [reader.get_version("golf", v) for v in (2, 3, 4)] == [
+        {"k0": 1, "k1": 200, "k2": 1},
+        {"k0": 100, "k1": 200, "k2": 300},
+        {"k0": 100, "k1": 200, "k2": 4},
+    ]
+    assert all(line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+
+
+def test_legacy_data_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "data.json"
+    legacy.write_text(json.dumps({"golf": {"car_purchase_price": 1.0}, "polo": {"car_purchase_price": 2.0}}),
+                      encoding="utf-8")
+    path = tmp_path / "history.jsonl"
+
+    store = VersionedConfigStore(str(path), legacy_filepath=str(legacy))
+    assert store.load_all() == ConfigStore(str(legacy)).load_all()
+    VersionedConfigStore(str(path), legacy_filepath=str(legacy))
+    assert [entry["version"] for entry in store.history("golf")] == [1]
+
+
+def test_open_config_store_picks_store_by_extension(tmp_path):
+    assert type(open_config_store(str(tmp_path / "data.json"))) is ConfigStore
+    assert type(open_config_store(str(tmp_path / "history.jsonl"))) is VersionedConfigStore
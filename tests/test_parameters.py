@@ -0,0 +1,125 @@
+# tests/test_parameters.py
+import io
+import math
+
+import pytest
+
+from src.calculator import PARAMETER_DEFAULTS
+from src.parameters import (MAX_LIFETIME_YEARS, PARAMETER_SCHEMA, ParameterField, ParameterValidator,
+                            read_parameters_csv, validate_parameters)
+
+
+def test_missing_and_empty_values_get_defaults():
+    result = validate_parameters({"car_purchase_price": "  ", "usage_km_per_year": None})
+    assert result.ok
+    assert result.values == PARAMETER_DEFAULTS
+    assert list(result.values) == [field.key for field in PARAMETER_SCHEMA]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("12345,67", 12345.67),
+    (" 1.5 ", 1.5),
+    ("-3", -3.0),
+    (7, 7.0),
+    (2.25, 2.25),
+])
+def test_float_fields_accept_numbers_and_comma_decimals(raw, expected):
+    value = validate_parameters({"car_purchase_price": raw}).values["car_purchase_price"]
+    assert value == expected
+    assert type(value) is float
+
+
+@pytest.mark.parametrize("raw, expected", [("5", 5), (5, 5), (5.0, 5)])
+def test_int_fields_accept_whole_numbers(raw, expected):
+    value = validate_parameters({"financing_duration_years": raw}).values["financing_duration_years"]
+    assert value == expected
+    assert type(value) is int
+
+
+@pytest.mark.parametrize("raw", ["5.5", "5,0", 5.5, True, "fünf"])
+def test_int_fields_reject_fractions_text_and_booleans(raw):
+    result = validate_parameters({"financing_duration_years": raw})
+    assert "ganze Zahl" in result.errors["financing_duration_years"]
+
+
+@pytest.mark.parametrize("raw", ["inf", "-inf", "nan", "Infinity", math.inf, -math.inf, math.nan])
+def test_non_finite_values_are_rejected(raw):
+    result = validate_parameters({"car_purchase_price": raw, "usage_car_lifetime_years": raw})
+    assert set(result.errors) == {"car_purchase_price", "usage_car_lifetime_years"}
+
+
+def test_bounds_and_all_errors_at_once():
+    result = validate_parameters({
+        "insurance_annual_cost": "-1",
+        "usage_car_lifetime_years": "0",
+        "financing_balloon_payment": "abc",
+    })
+    assert list(result.errors) == ["insurance_annual_cost", "usage_car_lifetime_years", "financing_balloon_payment"]
+    assert result.error_message().count("\n") == 2
+    assert validate_parameters({"usage_car_lifetime_years": MAX_LIFETIME_YEARS}).ok
+    assert not validate_parameters({"usage_car_lifetime_years": MAX_LIFETIME_YEARS + 1}).ok
+
+
+def test_validator_reparses_only_changed_fields(monkeypatch):
+    parsed = []
+    original_parse = ParameterField.parse
+
+    def counting_parse(field, raw):
+        parsed.append(field.key)
+        return original_parse(field, raw)
+    monkeypatch.setattr(ParameterField, "parse", counting_parse)
+
+    validator = ParameterValidator()
+    raw = {field.key: "1" for field in PARAMETER_SCHEMA}
+    first = validator.validate(raw)
+    assert len(parsed) == len(PARAMETER_SCHEMA)
+
+    parsed.clear()
+    assert validator.validate(dict(raw)).values == first.values
+    assert parsed == []
+
+    # Gleicher Wert, anderer Typ: "1" (Text) und 1 (Zahl) werden nicht verwechselt
+    validator.validate({**raw, "car_purchase_price": "2,5", "usage_km_per_year": 1})
+    assert parsed == ["car_purchase_price", "usage_km_per_year"]
+
+    # Auch Fehler werden zwischengespeichert
+    validator.validate(raw)
+    parsed.clear()
+    validator.validate({**raw, "car_purchase_price": "x"})
+    assert validator.validate({**raw, "car_purchase_price": "x"}).errors.keys() == {"car_purchase_price"}
+    assert parsed == ["car_purchase_price"]
+
+    validator.clear_cache()
+    parsed.clear()
+    validator.validate(raw)
+    assert len(parsed) == len(PARAMETER_SCHEMA)
+
+
+def test_csv_with_semicolons_and_comma_decimals():
+    text = ("name;car_purchase_price;usage_fuel_price_per_liter;usage_car_lifetime_years\n"
+            "Golf;32000,50;1,79;8\n"
+            ";15000;1,65;abc\n")
+    rows = list(read_parameters_csv(io.StringIO(text)))
+
+    assert [(line, name) for line, name, _ in rows] == [(2, "Golf"), (3, "Zeile 3")]
+    golf = rows[0][2]
+    assert golf.ok
+    assert golf.values["car_purchase_price"] == 32000.5
+    assert golf.values["usage_fuel_price_per_liter"] == 1.79
+    assert golf.values["usage_car_lifetime_years"] == 8
+    assert golf.values["insurance_annual_cost"] == PARAMETER_DEFAULTS["insurance_annual_cost"]
+    assert set(rows[1][2].errors) == {"usage_car_lifetime_years"}
+
+
+def test_csv_with_comma_delimiter():
+    text = "name,car_purchase_price,financing_duration_years\nPolo,18000.5,4\n"
+    (_, name, result), = read_parameters_csv(io.StringIO(text))
+    assert name == "Polo"
+    assert result.values["car_purchase_price"] == 18000.5
+    assert result.values["financing_duration_years"] == 4
+
+
+def test_csv_with_unknown_column_is_rejected():
+    text = "name;car_purchase_prize;usage_km_per_year\nGolf;32000;12000\n"
+    with pytest.raises(ValueError, match="car_purchase_prize"):
+        list(read_parameters_csv(io.StringIO(text)))
@@ -0,0 +1,107 @@
+# tests/test_report_export.py
+import csv
+import json
+import os
+
+import pytest
+
+from src.calculator import COST_COMPONENTS, calculate_batch, cents_to_euros, sum_totals_cents
+from src.report_export import export_reports, main, render_charts, safe_filename
+
+
+def _configs(count):
+    return [(f"Auto {i}", {"car_purchase_price": 15000.0 + 2500.0 * i, "financing_interest_rate_percent": 3.5,
+                           "financing_duration_years": i % 4, "insurance_annual_cost": 1009.38,
+                           "car_consumption_per_100km": 5.5, "usage_car_lifetime_years": 1 + i % 3})
+            for i in range(count)]
+
+
+def _read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_csv_and_json_match_calculate_batch(tmp_path):
+    named_params = _configs(7)
+    expected = calculate_batch([params for _, params in named_params])
+    # chunk_size < Anzahl Konfigurationen, damit mehrere Blöcke geschrieben werden
+    export_reports(named_params, str(tmp_path), formats=("csv", "json"), chunk_size=3)
+
+    monthly = _read_csv(tmp_path / "monthly_breakdown.csv")
+    assert monthly[0] == ["config", "month"] + list(COST_COMPONENTS) + ["total"]
+    assert len(monthly) - 1 == sum(len(result["monthly_data"]) for result in expected)
+    first_rows = [row for row in monthly[1:] if row[0] == "Auto 1"]
+    assert [float(value) for value in first_rows[0][2:]] == [
+        expected[1]["monthly_data"][0][key] for key in COST_COMPONENTS + ("total",)]
+
+    totals = _read_csv(tmp_path / "component_totals.csv")
+    assert len(totals) - 1 == len(named_params)
+    for (name, _), row, result in zip(named_params, totals[1:], expected):
+        assert row[0] == name
+        assert [float(value) for value in row[1:]] == (
+            [result["component_totals"][key] for key in COST_COMPONENTS] + [result["total_lifetime_cost"]])
+
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    assert [entry["config"] for entry in report] == [name for name, _ in named_params]
+    assert [entry["monthly_data"] for entry in report] == [result["monthly_data"] for result in expected]
+    assert [entry["total_lifetime_cost"] for entry in report] == [result["total_lifetime_cost"] for result in expected]
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_json_report_is_valid_for_any_number_of_configs(tmp_path, count):
+    paths = export_reports(_configs(count), str(tmp_path), formats=("json",))
+    assert paths == [str(tmp_path / "report.json")]
+    assert len(json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))) == count
+
+
+def test_sum_row_in_cent_mode_equals_exact_sum(tmp_path):
+    named_params = _configs(9)
+    export_reports(named_params, str(tmp_path), exact_cents=True, chunk_size=4)
+
+    totals = _read_csv(tmp_path / "component_totals.csv")
+    assert totals[-1][0] == "SUMME"
+    assert len(totals) - 2 == len(named_params)
+    sums = sum_totals_cents(calculate_batch([params for _, params in named_params], exact_cents=True))
+    assert [float(value) for value in totals[-1][1:]] == [
+        cents_to_euros(sums[key]) for key in COST_COMPONENTS + ("total",)]
+
+
+def test_safe_filename():
+    assert safe_filename("Golf GTI (2024)") == "Golf_GTI__2024_"
+    assert safe_filename("Polo/2") == "Polo_2"
+    assert safe_filename("   ") == "konfiguration"
+
+
+def test_render_charts_makes_colliding_filenames_unique(tmp_path):
+    params = {"car_purchase_price": 20000.0, "financing_duration_years": 2, "usage_car_lifetime_years": 2}
+    named_params = [("Polo/2", params), ("Polo_2", params), ("Golf", params)]
+    written = render_charts(named_params, str(tmp_path), workers=1, figsize=(3, 2), dpi=40)
+
+    assert [os.path.basename(path) for path in written] == ["Polo_2.png", "Polo_2_2.png", "Golf.png"]
+    for path in written:
+        with open(path, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_cli_rejects_duplicate_names_and_unknown_columns(tmp_path, capsys):
+    duplicates = tmp_path / "duplicates.csv"
+    duplicates.write_text("name;car_purchase_price\nGolf;30000\nPolo;18000\nGolf;31000\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main(["--csv", str(duplicates), "--out-dir", str(tmp_path / "out")])
+    assert "Zeile 4 (Golf): Name bereits in Zeile 2 vergeben." in capsys.readouterr().err
+
+    misspelled = tmp_path / "misspelled.csv"
+    misspelled.write_text("name;car_purchase_prize\nGolf;30000\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main(["--csv", str(misspelled), "--out-dir", str(tmp_path / "out")])
+    assert "car_purchase_prize" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
+
+
+def test_cli_exports_csv_input(tmp_path):
+    source = tmp_path / "flotte.csv"
+    source.write_text("name;car_purchase_price;usage_car_lifetime_years\nGolf;30000;2\nPolo;18000;3\n",
+                      encoding="utf-8")
+    main(["--csv", str(source), "--out-dir", str(tmp_path / "out"), "--exact-cents"])
+    totals = _read_csv(tmp_path / "out" / "component_totals.csv")
+    assert [row[0] for row in totals[1:]] == ["Golf", "Polo", "SUMME"]
@@ -0,0 +1,187 @@
+# tests/test_scenario_tree.py
+import numpy as np
+import pytest
+
+from src.calculator import CostCalculator, COST_COMPONENTS, to_cents
+from src.scenario_tree import ScenarioTree
+
+BASE = {
+    "car_purchase_price": 32000.0,
+    "car_running_costs_monthly": 85.0,
+    "car_consumption_per_100km": 6.4,
+    "financing_interest_rate_percent": 3.9,
+    "financing_duration_years": 5,
+    "financing_balloon_payment": 6000.0,
+    "insurance_annual_cost": 1009.38,
+    "usage_km_per_year": 17500.0,
+    "usage_fuel_price_per_liter": 1.79,
+    "usage_car_lifetime_years": 10,
+    "general_operating_cost_increase_percent": 2.5,
+}
+
+
+def _fuel_price_branch_components(month: int, fuel_price: float) -> dict:
+    """Direkt berechnet: vor month BASE, ab month gilt fuel_price und steigt ab dem Folgejahr weiter."""
+    before = CostCalculator.from_parameters(BASE).get_monthly_components(1, month - 1)
+    after = CostCalculator.from_parameters(BASE).get_monthly_components(month, 120)
+    growth = 1 + BASE["general_operating_cost_increase_percent"] / 100.0
+    years_since_branch = (np.arange(month, 121) - 1) // 12 - (month - 1) // 12
+    fuel_per_month = BASE["usage_km_per_year"] / 12.0 / 100.0 * BASE["car_consumption_per_100km"]
+    after["fuel"] = fuel_per_month * (fuel_price * np.power(growth, years_since_branch))
+    return {key: np.concatenate([before[key], after[key]]) for key in before}
+
+
+def _annuity(principal, annual_rate_percent, months):
+    rate = annual_rate_percent / 100.0 / 12.0
+    return principal * rate / (1 - (1 + rate) ** -months)
+
+
+@pytest.mark.parametrize("exact_cents", [False, True])
+def test_branch_without_overrides_equals_parent(exact_cents):
+    tree = ScenarioTree(BASE, exact_cents=exact_cents)
+    child = tree.root.branch("unverändert", 37, {})
+    grandchild = child.branch("weiterhin unverändert", 61, {})
+
+    expected = tree.root.get_cost_breakdown()
+    assert child.get_cost_breakdown() == expected
+    assert grandchild.get_cost_breakdown() == expected
+
+
+@pytest.mark.parametrize("exact_cents", [False, True])
+def test_root_equals_direct_calculation(exact_cents):
+    tree = ScenarioTree(BASE, exact_cents=exact_cents)
+    expected = CostCalculator.from_parameters(BASE).get_cost_breakdown_for_chart(120, exact_cents=exact_cents)
+    result = tree.root.get_cost_breakdown()
+    assert result["monthly_data"] == expected["monthly_data"]
+    assert result["component_totals"] == pytest.approx(expected["component_totals"], abs=0.011)
+
+
+def test_fuel_price_branch_equals_piecewise_calculation():
+    tree = ScenarioTree(BASE)
+    branch = tree.root.branch("Kraftstoff 2,10 €", 37, {"usage_fuel_price_per_liter": 2.10})
+    expected = _fuel_price_branch_components(37, 2.10)
+
+    components = branch.monthly_components()
+    for key in expected:
+        assert components[key] == pytest.approx(expected[key], rel=1e-12)
+    # Der angegebene Preis gilt ab dem Verzweigungsmonat, nicht als Preis des ersten Jahres
+    fuel_per_month = BASE["usage_km_per_year"] / 12.0 / 100.0 * BASE["car_consumption_per_100km"]
+    assert branch.get_cost_breakdown()["monthly_data"][36]["fuel"] == round(fuel_per_month * 2.10, 2)
+    totals = branch.totals()
+    assert totals["component_totals"]["fuel"] == pytest.approx(expected["fuel"].sum(), abs=0.01)
+    assert totals["component_totals"]["financing"] == pytest.approx(expected["financing_actual"].sum(), abs=0.01)
+    # Die Monate vor dem Zweig stammen unverändert vom Elternknoten
+    assert branch.get_cost_breakdown()["monthly_data"][:36] == tree.root.get_cost_breakdown()["monthly_data"][:36]
+
+
+def test_fuel_price_branch_in_cent_mode_is_exact():
+    tree = ScenarioTree(BASE, exact_cents=True)
+    branch = tree.root.branch("Kraftstoff 2,10 €", 37, {"usage_fuel_price_per_liter": 2.10})
+    expected = {key: to_cents(values) for key, values in _fuel_price_branch_components(37, 2.10).items()}
+
+    totals = branch.totals()
+    assert totals["component_totals_cents"] == {
+        "financing": int(expected["financing_actual"].sum()),
+        "operation": int(expected["operation"].sum()),
+        "insurance": int(expected["insurance"].sum()),
+        "fuel": int(expected["fuel"].sum()),
+    }
+    assert totals["total_lifetime_cost_cents"] == sum(
+        int(expected[source].sum()) for source in ("financing_actual", "operation", "insurance", "fuel"))
+
+    monthly = branch.get_cost_breakdown()["monthly_data"]
+    for key in COST_COMPONENTS:
+        assert to_cents([item[key] for item in monthly]).tolist() == expected[key].tolist()
+
+
+def test_new_cost_increase_applies_from_the_following_year():
+    tree = ScenarioTree(BASE)
+    branch = tree.root.branch("10 % Teuerung", 40, {"general_operating_cost_increase_percent": 10.0})
+    base = tree.root.monthly_components()
+    components = branch.monthly_components()
+
+    # Bis zum Ende des laufenden Jahres (Monat 48) bleibt das Preisniveau des Elternszenarios
+    for key in ("operation", "insurance", "fuel"):
+        assert np.array_equal(components[key][:48], base[key][:48])
+        assert components[key][48] == pytest.approx(base[key][47] * 1.10, rel=1e-12)
+        assert components[key][60] == pytest.approx(base[key][47] * 1.10 ** 2, rel=1e-12)
+    assert np.array_equal(components["financing_actual"], base["financing_actual"])
+
+
+def test_refinancing_branch_finances_the_remaining_balance():
+    params = {**BASE, "car_purchase_price": 30000.0, "financing_interest_rate_percent": 4.0,
+              "financing_duration_years": 5, "financing_balloon_payment": 0.0}
+    tree = ScenarioTree(params)
+    branch = tree.root.branch("Umschuldung 2 %", 37, {"financing_interest_rate_percent": 2.0})
+
+    # Tilgungsplan von Hand: 36 Raten zu 4 %, dann die Restschuld zu 2 % über die restlichen 24 Monate
+    old_payment = _annuity(30000.0, 4.0, 60)
+    balance = 30000.0
+    for _ in range(36):
+        balance = balance * (1 + 0.04 / 12) - old_payment
+    new_payment = _annuity(balance, 2.0, 24)
+    expected = np.array([old_payment] * 36 + [new_payment] * 24 + [0.0] * 60)
+
+    financing = branch.monthly_components()["financing_actual"]
+    assert financing == pytest.approx(expected, rel=1e-9)
+    total_financing = branch.totals()["component_totals"]["financing"]
+    assert total_financing == pytest.approx(36 * old_payment + 24 * new_payment, abs=0.01)
+    # Günstiger als ohne Umschuldung, und der Kaufpreis wird nicht ein zweites Mal bezahlt
+    assert total_financing < tree.root.totals()["component_totals"]["financing"]
+
+
+def test_refinancing_keeps_the_open_balloon_payment():
+    tree = ScenarioTree(BASE)
+    branch = tree.root.branch("Umschuldung", 25, {"financing_interest_rate_percent": 2.0})
+    financing = branch.monthly_components()["financing_actual"]
+    base = tree.root.monthly_components()["financing_actual"]
+
+    assert np.array_equal(financing[:24], base[:24])
+    # Gleiche Restlaufzeit, die Schlussrate bleibt im letzten Monat fällig
+    assert np.count_nonzero(financing) == 60
+    assert financing[59] > BASE["financing_balloon_payment"] > financing[58]
+    assert financing[24:59].max() < base[24]
+
+
+def test_refinancing_with_new_duration_and_explicit_amount():
+    tree = ScenarioTree(BASE)
+    longer = tree.root.branch("länger", 37, {"financing_duration_years": 4, "financing_balloon_payment": 0})
+    assert np.count_nonzero(longer.monthly_components()["financing_actual"]) == 36 + 48
+
+    # Nach Ende des Kredits: ein angegebener Kaufpreis ist der neu finanzierte Betrag
+    follow_up = tree.root.branch("Anschlussfinanzierung", 61,
+                                 {"car_purchase_price": 8000, "financing_duration_years": 2,
+                                  "financing_balloon_payment": 0})
+    financing = follow_up.monthly_components()["financing_actual"]
+    assert financing[60:84] == pytest.approx([_annuity(8000, BASE["financing_interest_rate_percent"], 24)] * 24)
+    assert not financing[84:].any()
+
+    # Eine Zinsänderung nach Ende des Kredits finanziert nichts neu
+    late = tree.root.branch("zu spät", 61, {"financing_interest_rate_percent": 1.0})
+    assert not late.monthly_components()["financing_actual"][60:].any()
+
+
+def test_nested_branches_reuse_each_prefix():
+    tree = ScenarioTree(BASE, exact_cents=True)
+    cheaper_fuel = tree.root.branch("günstiger", 25, {"usage_fuel_price_per_liter": 1.50})
+    longer = cheaper_fuel.branch("länger", 97, {"usage_car_lifetime_years": 14})
+
+    components = longer.monthly_components()
+    assert len(components["fuel"]) == 14 * 12
+    assert np.array_equal(components["fuel"][:96], cheaper_fuel.monthly_components()["fuel"][:96])
+    assert longer.cumulative_totals(24) == tree.root.cumulative_totals(24)
+    assert tree.find("länger") is longer
+    assert longer.path() == ["Basis", "günstiger", "länger"]
+
+
+def test_branch_rejects_month_outside_lifetimes():
+    tree = ScenarioTree(BASE)
+    with pytest.raises(ValueError):
+        tree.root.branch("nach dem Ende", 122, {})
+    with pytest.raises(ValueError):
+        tree.root.branch("zu kurz", 40, {"usage_car_lifetime_years": 3})
+    child = tree.root.branch("ab Jahr 4", 37, {})
+    with pytest.raises(ValueError):
+        child.branch("vor dem Elternzweig", 12, {})
+    with pytest.raises(ValueError):
+        tree.root.branch("ungültig", 37, {"usage_fuel_price_per_liter": "abc"})
@@ -0,0 +1,202 @@
+# tests/test_service.py
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.service as service_module
+from src.calculator import calculate_batch
+from src.config_store import ConfigStore, VersionedConfigStore
+from src.service import CalculationService, _ensure_loopback
+
+GOLF = {"car_purchase_price": 30000.0, "financing_interest_rate_percent": 4.0, "financing_duration_years": 5,
+        "car_consumption_per_100km": 6.0, "usage_car_lifetime_years": 3}
+
+
+def _run_with_service(store, scenario, **service_kwargs):
+    """Startet den Service auf einem freien Loopback-Port und führt scenario(port, service) aus."""
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            service = CalculationService(store, executor, **service_kwargs)
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return await scenario(port, service)
+            finally:
+                server.close()
+                await server.wait_closed()
+    return asyncio.run(main())
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return int(status_line.split()[1]), headers, json.loads(body)
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode("latin-1") + body)
+    await writer.drain()
+    status, _, data = await _read_response(reader)
+    writer.close()
+    return status, data
+
+
+@pytest.fixture
+def versioned_store(tmp_path):
+    return VersionedConfigStore(str(tmp_path / "history.jsonl"), legacy_filepath=None)
+
+
+def test_concurrent_calculations_share_one_batch(versioned_store, monkeypatch):
+    calls = []
+
+    def counting_calculate_batch(parameter_sets, exact_cents=False):
+        calls.append(len(parameter_sets))
+        return calculate_batch(parameter_sets, exact_cents)
+    monkeypatch.setattr(service_module, "calculate_batch", counting_calculate_batch)
+
+    variants = [{**GOLF, "car_purchase_price": 20000.0 + 1000 * i} for i in range(5)]
+
+    async def scenario(port, service):
+        responses = await asyncio.gather(*(_request(port, "POST", "/calculate", p) for p in variants))
+        return responses, service.metrics.snapshot()
+
+    responses, metrics = _run_with_service(versioned_store, scenario, max_batch_size=64, max_delay_ms=200)
+    assert calls == [5]
+    assert metrics["batching"]["max_batch_size"] == 5
+    expected = calculate_batch([{**p, "usage_car_lifetime_years": 3} for p in variants])
+    assert [status for status, _ in responses] == [200] * 5
+    assert [data for _, data in responses] == expected
+
+
+def test_invalid_parameters_report_errors_per_field(versioned_store):
+    async def scenario(port, service):
+        return await _request(port, "POST", "/calculate",
+                              {"car_purchase_price": "abc", "usage_car_lifetime_years": 0,
+                               "financing_duration_years": 2.5})
+
+    status, data = _run_with_service(versioned_store, scenario)
+    assert status == 400
+    assert set(data["details"]) == {"car_purchase_price", "usage_car_lifetime_years", "financing_duration_years"}
+
+
+def test_overflowing_result_is_rejected_instead_of_infinity(versioned_store):
+    async def scenario(port, service):
+        return await _request(port, "POST", "/calculate", {**GOLF, "financing_interest_rate_percent": 1e10})
+
+    status, data = _run_with_service(versioned_store, scenario)
+    assert status == 400
+    assert "nicht endliche" in data["error"]
+
+
+def test_batch_endpoint_requires_boolean_exact_cents(versioned_store):
+    async def scenario(port, service):
+        exact = await _request(port, "POST", "/calculate/batch", {"configurations": [GOLF], "exact_cents": True})
+        invalid = await _request(port, "POST", "/calculate/batch", {"configurations": [GOLF], "exact_cents": "no"})
+        return exact, invalid
+
+    (status, data), (invalid_status, _) = _run_with_service(versioned_store, scenario)
+    assert status == 200
+    assert data["results"] == calculate_batch([GOLF], exact_cents=True)
+    assert invalid_status == 400
+
+
+@pytest.mark.parametrize("head", [
+    b"POST /calculate HTTP/1.1\r\nContent-Length: 200\r\n\r\n",
+    b"POST /calculate HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n",
+    b"POST /calculate HTTP/1.1\r\nContent-Length: zehn\r\n\r\n",
+])
+def test_connection_is_closed_when_body_was_not_read(versioned_store, head):
+    async def scenario(port, service):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Die nachfolgenden Bytes dürfen nicht als zweite Anfrage ausgewertet werden.
+        writer.write(head + b"GET /health HTTP/1.1\r\n\r\n" + b"x" * 200)
+        await writer.drain()
+        status, headers, _ = await _read_response(reader)
+        rest = await reader.read()
+        writer.close()
+        return status, headers, rest
+
+    status, headers, rest = _run_with_service(versioned_store, scenario, max_body_bytes=100)
+    assert status in (400, 411, 413)
+    assert headers["connection"] == "close"
+    assert rest == b""
+
+
+def test_keep_alive_serves_several_requests(versioned_store):
+    async def scenario(port, service):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        results = []
+        for _ in range(3):
+            writer.write(b"GET /health HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            results.append(await _read_response(reader))
+        writer.close()
+        return results
+
+    results = _run_with_service(versioned_store, scenario)
+    assert [(status, data) for status, _, data in results] == [(200, {"status": "ok"})] * 3
+
+
+def test_config_routes_with_history(versioned_store):
+    async def scenario(port, service):
+        return [
+            await _request(port, "PUT", "/configs/Golf%20GTI", GOLF),
+            await _request(port, "PUT", "/configs/Golf%20GTI", {**GOLF, "car_purchase_price": 28000.0}),
+            await _request(port, "GET", "/configs"),
+            await _request(port, "GET", "/configs/Golf%20GTI"),
+            await _request(port, "POST", "/configs/Golf%20GTI/calculate"),
+            await _request(port, "GET", "/configs/Golf%20GTI/history"),
+            await _request(port, "GET", "/configs/Golf%20GTI/versions/1"),
+            await _request(port, "GET", "/configs/Golf%20GTI/versions/9"),
+            await _request(port, "DELETE", "/configs/Golf%20GTI"),
+            await _request(port, "GET", "/configs/Golf%20GTI"),
+            await _request(port, "DELETE", "/configs/Golf%20GTI"),
+        ]
+
+    (created, updated, listed, fetched, calculated, history, version_1, missing_version,
+     deleted, gone, deleted_again) = _run_with_service(versioned_store, scenario)
+
+    assert created[0] == 201 and updated[0] == 200
+    assert listed == (200, {"configs": ["Golf GTI"]})
+    assert fetched[1]["parameters"]["car_purchase_price"] == 28000.0
+    assert calculated == (200, calculate_batch([fetched[1]["parameters"]])[0])
+    assert [v["version"] for v in history[1]["versions"]] == [1, 2]
+    assert version_1[1]["parameters"]["car_purchase_price"] == 30000.0
+    assert missing_version[0] == 404
+    assert deleted == (200, {"deleted": "Golf GTI"})
+    assert gone[0] == 404 and deleted_again[0] == 404
+
+
+def test_history_requires_versioned_store(tmp_path):
+    async def scenario(port, service):
+        await _request(port, "PUT", "/configs/Golf", GOLF)
+        return await _request(port, "GET", "/configs/Golf/history")
+
+    status, _ = _run_with_service(ConfigStore(str(tmp_path / "data.json")), scenario)
+    assert status == 404
+
+
+def test_unknown_route_and_method(versioned_store):
+    async def scenario(port, service):
+        return (await _request(port, "GET", "/unbekannt"), await _request(port, "POST", "/configs/Golf"))
+
+    (not_found, _), (not_allowed, _) = _run_with_service(versioned_store, scenario)
+    assert (not_found, not_allowed) == (404, 405)
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "192.168.1.10", "example.org"])
+def test_service_refuses_non_loopback_hosts(host):
+    with pytest.raises(ValueError):
+        _ensure_loopback(host)
@@ -0,0 +1,117 @@
+# cost_car_calc/tools/load_test.py
+"""
+Lasttest für den lokalen Autokosten-Service (service.py).
+
+Öffnet mehrere Keep-Alive-Verbindungen gleichzeitig, sendet zufällige Konfigurationen
+an /calculate (bzw. /calculate/batch) und gibt Durchsatz und Latenz-Perzentile aus.
+Benötigt nur die Standardbibliothek und läuft vollständig offline gegen localhost.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def random_parameters(rng: random.Random) -> dict:
+    return {
+        "car_purchase_price": round(rng.uniform(8000, 80000), 2),
+        "car_running_costs_monthly": round(rng.uniform(50, 400), 2),
+        "car_consumption_per_100km": round(rng.uniform(3, 12), 1),
+        "financing_interest_rate_percent": round(rng.uniform(0, 9), 2),
+        "financing_duration_years": rng.randint(0, 8),
+        "financing_balloon_payment": rng.choice([0.0, round(rng.uniform(1000, 15000), 2)]),
+        "insurance_annual_cost": round(rng.uniform(300, 1500), 2),
+        "usage_km_per_year": rng.choice([5000.0, 10000.0, 15000.0, 25000.0, 40000.0]),
+        "usage_fuel_price_per_liter": round(rng.uniform(1.4, 2.2), 2),
+        "usage_car_lifetime_years": rng.randint(1, 15),
+        "general_operating_cost_increase_percent": round(rng.uniform(0, 5), 2),
+    }
+
+
+async def _request(reader, writer, host: str, method: str, path: str, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\n"
+                  f"Host: {host}\r\n"
+                  f"Content-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    return status, json.loads(await reader.readexactly(length)) if length else None
+
+
+async def _worker(host, port, path, requests_per_worker, batch_size, seed, latencies, errors):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests_per_worker):
+            if batch_size > 1:
+                payload = {"configurations": [random_parameters(rng) for _ in range(batch_size)]}
+            else:
+                payload = random_parameters(rng)
+            started = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", path, payload)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))]
+
+
+async def run_load_test(host, port, concurrency, requests_per_worker, batch_size):
+    path = "/calculate/batch" if batch_size > 1 else "/calculate"
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, path, requests_per_worker, batch_size, seed, latencies, errors)
+        for seed in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_metrics = await _request(reader, writer, host, "GET", "/metrics")
+    writer.close()
+
+    latencies.sort()
+    total_requests = len(latencies)
+    print(f"Endpunkt:            {path}")
+    print(f"Verbindungen:        {concurrency}")
+    print(f"Anfragen gesamt:     {total_requests} ({len(errors)} Fehler)")
+    print(f"Konfigurationen:     {total_requests * batch_size}")
+    print(f"Dauer:               {elapsed:.2f} s")
+    print(f"Durchsatz:           {total_requests / elapsed:.1f} Anfragen/s, "
+          f"{total_requests * batch_size / elapsed:.1f} Konfigurationen/s")
+    print(f"Latenz p50/p95/p99:  {_percentile(latencies, 50):.2f} / {_percentile(latencies, 95):.2f} / "
+          f"{_percentile(latencies, 99):.2f} ms")
+    print(f"Server-Batching:     {json.dumps(server_metrics.get('batching', {}), ensure_ascii=False)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lasttest für den lokalen Autokosten-Service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32, help="Anzahl paralleler Verbindungen")
+    parser.add_argument("--requests", type=int, default=100, help="Anfragen pro Verbindung")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Konfigurationen pro Anfrage (>1 nutzt /calculate/batch)")
+    args = parser.parse_args(argv)
+    asyncio.run(run_load_test(args.host, args.port, args.concurrency, args.requests, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()